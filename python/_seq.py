@@ -11,6 +11,12 @@
 #   with SequenceMatcher's expected Python Unicode Objects.
 #   Result: Segfault (silent crash) on Japanese/Chinese text.
 #
+# UPDATE (matcher rewrite):
+#   No more Unicode += (list + join). With RapidFuzz installed its C++
+#   Indel ratio pre-filters candidates and SequenceMatcher only confirms
+#   the few that can pass — cut points are the same as difflib alone.
+#   SequenceMatcher still runs in every build, so this file stays .py.
+#
 # WHAT'S EXPOSED:
 #   ~90 lines of string matching logic — LOW commercial value.
 #   Competitor sees: "difflib.SequenceMatcher + ratio > 0.85"
@@ -25,19 +31,61 @@ from __future__ import annotations
 import difflib
 import gc
 import re
+from collections import Counter
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
+# RapidFuzz: C++ Indel ratio (bit-parallel). Indel counts the full LCS while
+# difflib's matching blocks are a subset of one, so its ratio is never below
+# difflib's — a cheap upper bound. Optional: difflib alone when not installed.
+try:
+    from rapidfuzz.fuzz import ratio as _rf_ratio
+except ImportError:
+    _rf_ratio = None
+
+
+def _make_scorer(target: str, cutoff: float = 0.85):
+    """Return score(a) -> difflib similarity of a to target in [0, 1].
+
+    Only `score(a) > cutoff` is meaningful: with RapidFuzz, a candidate whose
+    Indel ratio is already below cutoff gets 0.0 without running difflib.
+    RapidFuzz matches fire earlier than difflib's at the same threshold (and
+    no single higher threshold lines them up), so difflib stays the judge.
+    The difflib matcher is built once per target: seq2 analysis (b2j index)
+    is cached and only seq1 changes between calls, as the difflib docs
+    recommend.
+    """
+    matcher = difflib.SequenceMatcher(None, "", target)
+    rf_cutoff = cutoff * 100.0
+
+    def score(a: str) -> float:
+        if _rf_ratio is not None and not _rf_ratio(a, target, score_cutoff=rf_cutoff):
+            return 0.0
+        matcher.set_seq1(a)
+        return matcher.ratio()
+
+    return score
+
+
+# Same set as the old regex class [.,\/#!$%\^&\*;:{}=\-_\`~()。、？「」…!] —
+# str.translate is a C table lookup per char, no regex engine per call
+_PUNCT_TABLE = dict.fromkeys(map(ord, ".,/#!$%^&*;:{}=-_`~()。、？「」…"), None)
+_SCRIPT_RE = re.compile(r"\[[Vv](\d+)\]\s*([^\[]+)", re.DOTALL)
+
 
+@lru_cache(maxsize=4096)
 def _clean_text(text: str) -> str:
-    """Normalize text for matching — remove punctuation, lowercase."""
-    text = (text or "").lower()
-    return re.sub(r"[.,\/#!$%\^&\*;:{}=\-_\`~()。、？「」…!]", "", text)
+    """Normalize text for matching — remove punctuation, lowercase.
+
+    Cached: script lines are re-cleaned on every recut/retry and the
+    per-word pieces in _match_words_to_script repeat heavily.
+    """
+    return (text or "").lower().translate(_PUNCT_TABLE)
 
 
 def _parse_script(content: str) -> List[Tuple[int, str]]:
     """Parse [V1] text format from script file."""
-    pattern = r"\[[Vv](\d+)\]\s*([^\[]+)"
-    return [(int(m[0]), m[1].strip()) for m in re.findall(pattern, content or "", re.DOTALL)]
+    return [(int(m.group(1)), m.group(2).strip()) for m in _SCRIPT_RE.finditer(content or "")]
 
 
 def _match_words_to_script(
@@ -46,7 +94,7 @@ def _match_words_to_script(
     log_func=None,
 ) -> List[Tuple[int, float, float, str]]:
     """
-    Match AI-detected words to script items using SequenceMatcher.
+    Match AI-detected words to script items using _make_scorer().
 
     3-AI Consensus Fix (Antigravity + AI Studio + Grok):
     - MAX_COLLECTED_LEN cap prevents SequenceMatcher C-level crash on long Unicode
@@ -66,35 +114,93 @@ def _match_words_to_script(
     MAX_COLLECTED_LEN = 5000   # Cap: prevent SequenceMatcher segfault (AI Studio + Grok)
     GC_INTERVAL = 20           # gc.collect() every N items (Grok: prevent memory buildup)
 
-    for item_idx, (vid, text) in enumerate(script_items):
-        target = _clean_text(text)
+    cleaned_targets = [_clean_text(text) for _, text in script_items]
+
+    for item_idx, ((vid, text), target) in enumerate(zip(script_items, cleaned_targets)):
         if not target:
             if log_func:
                 log_func(f"⚠️ [V{str(vid).zfill(2)}] Skip - empty target")
             continue
+        target_len = len(target)
+        score = _make_scorer(target)
+        target_counts = Counter(target)
 
         current_words: List[dict] = []
-        collected = ""
+        # Cleaned incrementally: _clean_text is per-character, so cleaning each
+        # appended word equals re-cleaning the whole prefix (O(N) not O(N²)).
+        # Pieces go into a list + running length; joined only when matching.
+        cleaned_parts: List[str] = []
+        word_idx: List[int] = []   # all_words index of each current_words entry
+        collected_len = 0
+        cleaned_len = 0
+        # Per-prefix char-multiset overlap with the target: common_at[i] is
+        # |chars(words[:i+1]) ∩ chars(target)| counted with multiplicity
+        seen_counts: dict = {}
+        common = 0
+        common_at: List[int] = []
+        cleaned_len_at: List[int] = []
+
+        # Matcher runs once every `check_every` words; one word rarely flips
+        # the 0.85 threshold. On a pass, the unchecked window is re-scanned
+        # oldest-first so the cut lands where a per-word check would put it.
+        check_every = max(1, int(target_len ** 0.5 / 4))
+        pending = 0
 
         while word_ptr < total_words:
             w = all_words[word_ptr]
             if isinstance(w, dict):
-                collected += " " + str(w.get("word", ""))
+                piece = " " + str(w.get("word", ""))
+                cleaned_piece = _clean_text(piece)
+                cleaned_parts.append(cleaned_piece)
+                word_idx.append(word_ptr)
+                collected_len += len(piece)
+                cleaned_len += len(cleaned_piece)
+                for ch in cleaned_piece:
+                    n = seen_counts.get(ch, 0)
+                    if n < target_counts[ch]:
+                        common += 1
+                    seen_counts[ch] = n + 1
+                common_at.append(common)
+                cleaned_len_at.append(cleaned_len)
                 current_words.append(w)
             word_ptr += 1
 
             # === SAFETY CAP (3-AI Consensus) ===
             # Prevent SequenceMatcher from receiving strings that crash at C level
-            if len(collected) > MAX_COLLECTED_LEN:
+            if collected_len > MAX_COLLECTED_LEN:
                 break
 
-            if len(collected) < len(target) * 0.5:
+            if collected_len < target_len * 0.5:
                 continue
 
-            ratio = difflib.SequenceMatcher(
-                None, _clean_text(collected), target
-            ).ratio()
-            if ratio > 0.85 or len(_clean_text(collected)) > len(target) + 20:
+            overflow = cleaned_len > target_len + 20
+            pending += 1
+            if pending < check_every and not overflow and word_ptr < total_words:
+                continue
+
+            n_words = len(current_words)
+            matched_at = 0
+            for k in range(max(1, n_words - pending + 1), n_words + 1):
+                # Fast path: 2*common/(la+lb) upper-bounds both difflib and
+                # RapidFuzz ratio (difflib's quick_ratio; the LCS can't exceed
+                # the shared char multiset) — skip the matcher, and the join,
+                # when it cannot pass 0.85. Exact match skips it too (every
+                # piece starts with " ", so compare past the leading space).
+                la = cleaned_len_at[k - 1]
+                if 2 * common_at[k - 1] <= 0.85 * (la + target_len):
+                    continue
+                cleaned_collected = "".join(cleaned_parts[:k]) if k < n_words else "".join(cleaned_parts)
+                if cleaned_collected[1:] == target or score(cleaned_collected) > 0.85:
+                    matched_at = k
+                    break
+            pending = 0
+
+            if matched_at:
+                if matched_at < n_words:
+                    del current_words[matched_at:]
+                    word_ptr = word_idx[matched_at - 1] + 1
+                break
+            if overflow:
                 break
 
         if not current_words:
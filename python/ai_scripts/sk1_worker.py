@@ -41,27 +41,64 @@ _FILTER_PATTERNS = [
     r"FutureWarning:",
 ]
 
+# Compiled once; patterns are ASCII-only so re.ASCII skips Unicode case-folding
+_FILTER_RE = re.compile("|".join(_FILTER_PATTERNS), re.IGNORECASE | re.ASCII)
+
+# Aho-Corasick prefilter (optional pyahocorasick): one linear pass finds the
+# leading literal of every pattern; only lines that hit one go to the regex.
+try:
+    import ahocorasick
+    _FILTER_AC = ahocorasick.Automaton()
+    for _pat in _FILTER_PATTERNS:
+        _lit = _pat.split(".*")[0].replace("\\", "").lower()
+        _FILTER_AC.add_word(_lit, _lit)
+    _FILTER_AC.make_automaton()
+except ImportError:
+    _FILTER_AC = None
+
+
+def _is_filtered(line):
+    """True if line matches a noise pattern."""
+    if _FILTER_AC is not None:
+        for _ in _FILTER_AC.iter(line.lower()):
+            return _FILTER_RE.search(line) is not None
+        return False
+    return _FILTER_RE.search(line) is not None
+
 class FilteredStderr:
     """Filter out noisy library messages from stderr."""
     def __init__(self, original):
         self.original = original
-        self.pattern = re.compile("|".join(_FILTER_PATTERNS), re.IGNORECASE)
-        self.buffer = ""
+        self.buffer = []  # Pending chunks of the incomplete last line
     
     def write(self, msg):
-        # Buffer multiline messages
-        self.buffer += msg
-        if "\n" in self.buffer:
-            lines = self.buffer.split("\n")
-            self.buffer = lines[-1]  # Keep incomplete line in buffer
-            for line in lines[:-1]:
-                if line.strip() and not self.pattern.search(line):
-                    self.original.write(line + "\n")
+        # Buffer multiline messages (list: no O(N²) concat on long tracebacks)
+        self.buffer.append(msg)
+        if "\n" in msg:
+            text = "".join(self.buffer)
+            kept = []
+            start = 0
+            # Walk newlines with find() — no throwaway list from split(),
+            # and no re-slicing of the remaining buffer per line
+            while True:
+                end = text.find("\n", start)
+                if end < 0:
+                    break
+                line = text[start:end]
+                start = end + 1
+                if line.strip() and not _is_filtered(line):
+                    kept.append(line)
+            self.buffer = [text[start:]]  # Keep incomplete line in buffer
+            if kept:
+                # One write per call — the target stream is unbuffered, so
+                # each write is a separate WriteFile syscall to the pipe
+                self.original.write("\n".join(kept) + "\n")
     
     def flush(self):
-        if self.buffer.strip() and not self.pattern.search(self.buffer):
-            self.original.write(self.buffer)
-        self.buffer = ""
+        pending = "".join(self.buffer)
+        if pending.strip() and not _is_filtered(pending):
+            self.original.write(pending)
+        self.buffer = []
         self.original.flush()
     
     def fileno(self):
@@ -72,35 +109,44 @@ sys.stderr = FilteredStderr(sys.stderr)
 sys.stdout = FilteredStderr(sys.stdout)
 
 # Suppress all warnings from these modules
-warnings.filterwarnings("ignore", category=UserWarning)
-warnings.filterwarnings("ignore", category=FutureWarning)
-warnings.filterwarnings("ignore", category=DeprecationWarning)
-warnings.filterwarnings("ignore", message=".*pkg_resources.*")
-warnings.filterwarnings("ignore", message=".*resume_download.*")
-warnings.filterwarnings("ignore", message=".*gradient_checkpointing.*")
-warnings.filterwarnings("ignore", message=".*TensorFloat-32.*")
-warnings.filterwarnings("ignore", message=".*ReproducibilityWarning.*")
-warnings.filterwarnings("ignore", message=".*Ignored unknown kwarg.*")
-warnings.filterwarnings("ignore", message=".*Some weights.*not used.*")
-warnings.filterwarnings("ignore", message=".*Some weights.*not initialized.*")
-warnings.filterwarnings("ignore", message=".*TRAIN this model.*")
-warnings.filterwarnings("ignore", message=".*Lightning automatically upgraded.*")
-warnings.filterwarnings("ignore", message=".*Model was trained with.*")
-warnings.filterwarnings("ignore", message=".*Bad things might happen.*")
+_IGNORED_WARNING_CATEGORIES = (UserWarning, FutureWarning, DeprecationWarning)
+_IGNORED_WARNING_MESSAGES = (
+    ".*pkg_resources.*",
+    ".*resume_download.*",
+    ".*gradient_checkpointing.*",
+    ".*TensorFloat-32.*",
+    ".*ReproducibilityWarning.*",
+    ".*Ignored unknown kwarg.*",
+    ".*Some weights.*not used.*",
+    ".*Some weights.*not initialized.*",
+    ".*TRAIN this model.*",
+    ".*Lightning automatically upgraded.*",
+    ".*Model was trained with.*",
+    ".*Bad things might happen.*",
+)
+_NOISY_LOGGERS = (
+    "pytorch_lightning",
+    "lightning",
+    "transformers",
+    "transformers.modeling_utils",
+    "huggingface_hub",
+    "pyannote",
+    "pyannote.audio",
+    "whisperx",
+    "whisperx.asr",
+    "whisperx.vads",
+    "whisperx.vads.pyannote",
+    "faster_whisper",
+)
+
+for _cat in _IGNORED_WARNING_CATEGORIES:
+    warnings.filterwarnings("ignore", category=_cat)
+# One filter entry for all messages: warnings scans its filter list per warning
+warnings.filterwarnings("ignore", message="(?:" + "|".join(_IGNORED_WARNING_MESSAGES) + ")")
 
 # Suppress logging from noisy modules
-logging.getLogger("pytorch_lightning").setLevel(logging.ERROR)
-logging.getLogger("lightning").setLevel(logging.ERROR)
-logging.getLogger("transformers").setLevel(logging.ERROR)
-logging.getLogger("transformers.modeling_utils").setLevel(logging.ERROR)
-logging.getLogger("huggingface_hub").setLevel(logging.ERROR)
-logging.getLogger("pyannote").setLevel(logging.ERROR)
-logging.getLogger("pyannote.audio").setLevel(logging.ERROR)
-logging.getLogger("whisperx").setLevel(logging.ERROR)
-logging.getLogger("whisperx.asr").setLevel(logging.ERROR)
-logging.getLogger("whisperx.vads").setLevel(logging.ERROR)
-logging.getLogger("whisperx.vads.pyannote").setLevel(logging.ERROR)
-logging.getLogger("faster_whisper").setLevel(logging.ERROR)
+for _name in _NOISY_LOGGERS:
+    logging.getLogger(_name).setLevel(logging.ERROR)
 
 # GROK FIX: Use transformers internal logging API
 try:
@@ -264,6 +310,26 @@ def get_display_name(model_name: str) -> str:
 import json
 import gc
 
+try:
+    import orjson  # Optional: C encoder, writes UTF-8 bytes directly
+except ImportError:
+    orjson = None
+
+
+def write_json(path: str, data) -> None:
+    """Write data as indented UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        try:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            payload = None  # Type orjson can't encode — use stdlib json below
+        if payload is not None:
+            with open(path, "wb") as f:
+                f.write(payload)
+            return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
 # ==============================================================================
 # 8. AURA SPLIT ULTIMATE FIX V2 - PyTorch 2.6+ NUCLEAR FIX
 # ==============================================================================
@@ -282,11 +348,12 @@ except Exception:
 # Step B: Force override weights_only=False (nuclear option)
 _original_torch_load = torch.load
 
-def _patched_torch_load(f, map_location=None, pickle_module=None, **kwargs):
+def _patched_torch_load(*args, **kwargs):
     """Nuclear patch: FORCE weights_only=False for all torch.load calls."""
-    # FORCE disable security check (required for pyannote/whisperx models)
+    # FORCE disable security check (required for pyannote/whisperx models).
+    # Overwrite, not setdefault/partial: callers (e.g. Lightning) may pass True.
     kwargs['weights_only'] = False
-    return _original_torch_load(f, map_location=map_location, pickle_module=pickle_module, **kwargs)
+    return _original_torch_load(*args, **kwargs)
 
 torch.load = _patched_torch_load
 # ==============================================================================
@@ -296,7 +363,7 @@ def aggressive_gc():
     """Force garbage collection and clear GPU cache."""
     gc.collect()
     try:
-        import torch
+        # torch is already bound at module scope (section 8 patch)
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
             torch.cuda.ipc_collect()
@@ -326,26 +393,43 @@ def transcribe_with_auto(model, audio, lang_code):
 
 def extract_words(result_segments):
     """Extract words from segments with fallback."""
-    all_words = []
-    for seg_idx, seg in enumerate(result_segments or []):
-        if isinstance(seg, dict) and "words" in seg and seg.get("words"):
-            # Handle case where words might be strings or dicts
-            for w in seg.get("words", []):
-                if isinstance(w, dict) and "start" in w:
-                    all_words.append(w)
-                elif isinstance(w, str):
-                    # Word is just a string, skip it (need alignment data)
-                    continue
-        else:
-            try:
-                all_words.append({
-                    "word": seg.get("text", ""),
-                    "start": seg["start"],
-                    "end": seg["end"]
-                })
-            except Exception:
-                continue
-    return all_words
+    # Single comprehension, no per-segment try/except. Segments without word
+    # alignment fall back to one segment-level entry (needs start + end);
+    # words that are plain strings (no alignment data) are skipped.
+    return [
+        w
+        for seg in result_segments or []
+        if isinstance(seg, dict)
+        for w in (
+            seg.get("words")
+            or ([{"word": seg.get("text", ""), "start": seg["start"], "end": seg["end"]}]
+                if "start" in seg and "end" in seg else ())
+        )
+        if isinstance(w, dict) and "start" in w
+    ]
+
+
+def find_incomplete_files(root):
+    """Yield *.incomplete paths under root (os.scandir reuses dir entry info)."""
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from find_incomplete_files(entry.path)
+                elif entry.name.endswith(".incomplete"):
+                    yield entry.path
+    except OSError:
+        return
+
+
+def remove_incomplete_file(path):
+    """Delete one stale download, return the log line."""
+    name = os.path.basename(path)
+    try:
+        os.remove(path)
+        return f"[AI]    Removed: {name}"
+    except Exception as e:
+        return f"[AI]    ⚠️ Could not remove {name}: {e}"
 
 
 def main():
@@ -366,7 +450,7 @@ def main():
     audio_path = config.get("audio_path", "")
     model_name = config.get("model_name", "large-v3-turbo")
     device = config.get("device", "cuda")
-    compute_type = config.get("compute_type", "float16")
+    compute_type = config.get("compute_type")  # None: picked below for the device
     lang_code = config.get("lang_code", None)
     fast_mode = config.get("fast_mode", False)
     model_cache_dir = config.get("model_cache_dir", None)
@@ -389,6 +473,16 @@ def main():
             device = "cpu"
             compute_type = "int8"
 
+        if not compute_type:
+            # int8 weights + fp16 math on GPUs with compute capability >= 7.5;
+            # plain int8 is slower than fp16 on older GPUs
+            if device != "cuda":
+                compute_type = "int8"
+            elif torch.cuda.get_device_capability(0) >= (7, 5):
+                compute_type = "int8_float16"
+            else:
+                compute_type = "float16"
+
         if device == "cuda":
             gpu_name = torch.cuda.get_device_name(0)
             total_vram = torch.cuda.get_device_properties(0).total_memory / (1024**3)
@@ -402,16 +496,13 @@ def main():
         # CRITICAL FIX: Clean up .incomplete files from previous failed downloads
         # These cause WinError 32 (file in use) and system freeze
         if model_cache_dir and os.path.exists(model_cache_dir):
-            from pathlib import Path
-            incomplete_files = list(Path(model_cache_dir).rglob("*.incomplete"))
+            incomplete_files = list(find_incomplete_files(model_cache_dir))
             if incomplete_files:
                 print(f"[AI] 🧹 Cleaning {len(incomplete_files)} incomplete download(s)...")
-                for p in incomplete_files:
-                    try:
-                        os.remove(p)
-                        print(f"[AI]    Removed: {p.name}")
-                    except Exception as e:
-                        print(f"[AI]    ⚠️ Could not remove {p.name}: {e}")
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=min(8, len(incomplete_files))) as pool:
+                    for msg in pool.map(remove_incomplete_file, incomplete_files):
+                        print(msg)
         
         # Check if model needs download
         model_folder = os.path.join(model_cache_dir, f"models--Systran--faster-whisper-{model_name}") if model_cache_dir else None
@@ -427,6 +518,9 @@ def main():
         }
         if model_cache_dir:
             load_kwargs["download_root"] = model_cache_dir
+        if device == "cpu":
+            # CTranslate2 defaults to 4 threads — use every core on CPU runs
+            load_kwargs["threads"] = os.cpu_count() or 4
 
         model = whisperx.load_model(**load_kwargs)
         print("[AI] ✅ Model loaded successfully!")
@@ -486,8 +580,7 @@ def main():
 
         # Write output
         os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        write_json(output_path, output_data)
 
         print(f"[AI] Output saved: {output_path}")
         print(f"[AI] Segments: {len(segments)}, Words: {len(words)}")
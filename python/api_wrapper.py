@@ -19,44 +19,207 @@ Output (stdout): JSON lines for progress tracking
 
 import sys
 import os
+import re
 import json
+import time
+import atexit
 import argparse
+import threading
 import traceback
 
-# ── Set HuggingFace env vars BEFORE any import that touches HF ──
-# Fixes WinError 1314 (symlink privilege) on Windows
-os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
-os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
-os.environ["HF_HUB_DISABLE_XET"] = "1"
-os.environ["HF_HUB_ENABLE_HF_TRANSFER"] = "0"
-os.environ["PYTHONIOENCODING"] = "utf-8"
+try:
+    import orjson  # Optional: C encoder, returns UTF-8 bytes directly
+except ImportError:
+    orjson = None
 
 # Add parent dir to path
 _script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, _script_dir)
 
 
+def _setup_hf_env():
+    """Set HuggingFace env vars BEFORE any import that touches HF.
+    Called once from main() after the config is read — engines are imported
+    lazily inside run_*, so this still precedes every HF import.
+    """
+    # Fixes WinError 1314 (symlink privilege) on Windows
+    os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
+    os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
+    os.environ["HF_HUB_DISABLE_XET"] = "1"
+    os.environ["HF_HUB_ENABLE_HF_TRANSFER"] = "0"
+    os.environ["PYTHONIOENCODING"] = "utf-8"
+
+
 def _sanitize_for_json_line(value):
     """Remove newlines from strings to keep JSON output as single line."""
+    # Fast path: clean strings and untouched containers are returned as-is
+    # (no new objects for the common log/progress payload)
     if isinstance(value, str):
+        if '\n' not in value and '\r' not in value:
+            return value.strip()
         return value.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ').strip()
     if isinstance(value, dict):
-        return {k: _sanitize_for_json_line(v) for k, v in value.items()}
+        out = None  # Copied on first change only
+        for k, v in value.items():
+            nv = _sanitize_for_json_line(v)
+            if nv is not v:
+                if out is None:
+                    out = dict(value)
+                out[k] = nv
+        return value if out is None else out
     if isinstance(value, list):
-        return [_sanitize_for_json_line(v) for v in value]
+        out = None
+        for i, v in enumerate(value):
+            nv = _sanitize_for_json_line(v)
+            if nv is not v:
+                if out is None:
+                    out = list(value)
+                out[i] = nv
+        return value if out is None else out
     return value
 
 
+# [NN/NN] progress markers in log lines — compiled once, scanned per log line
+_PROGRESS_RE = re.compile(r'\[(\d+)/(\d+)\]', re.ASCII)
+
+
+def _encode_line(payload) -> bytes:
+    """Compact one-line JSON as UTF-8 bytes (no trailing newline).
+    Neither encoder emits raw newlines without indent — they escape to \\n —
+    so no post-encode newline scrub is needed.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # Type orjson can't encode — stdlib json below
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _last_progress(msg: str):
+    """Return (cur, total) of the LAST [cur/total] marker in msg, or None."""
+    m = None
+    for m in _PROGRESS_RE.finditer(msg):
+        pass
+    if m is None:
+        return None
+    return int(m.group(1)), int(m.group(2))
+
+
+# ── Batched stdout ───────────────────────────────
+# Log floods (FFmpeg, per-clip lines) used to cost a print + flush each.
+# Lines now collect in a buffer written to the pipe once it reaches
+# _FLUSH_BYTES, or by the flusher thread _FLUSH_INTERVAL seconds after the
+# first unflushed line. The flusher sleeps on _out_pending while idle.
+# result / error / progress=100 flush immediately ("delivery confirmation").
+_FLUSH_BYTES = 4096
+_FLUSH_INTERVAL = 0.016
+
+_out_buf = bytearray()
+_out_lock = threading.Lock()
+_out_pending = threading.Event()
+
+
+def _flush_locked():
+    """Write pending bytes to stdout. Caller holds _out_lock."""
+    if not _out_buf:
+        return
+    sys.stdout.flush()  # Keep order with anything print()ed directly
+    out = getattr(sys.stdout, "buffer", None)
+    if out is not None:
+        out.write(_out_buf)
+        out.flush()
+    else:
+        sys.stdout.write(_out_buf.decode("utf-8"))
+        sys.stdout.flush()
+    _out_buf.clear()
+
+
+def flush_now():
+    """Push all buffered JSON lines to stdout right away."""
+    with _out_lock:
+        _flush_locked()
+
+
+def _write_line(line: bytes, urgent: bool = False):
+    with _out_lock:
+        _out_buf.extend(line)
+        _out_buf.extend(b"\n")
+        if urgent or len(_out_buf) >= _FLUSH_BYTES:
+            _flush_locked()
+        elif not _out_pending.is_set():
+            _out_pending.set()
+
+
+def _flusher():
+    """Daemon thread: drains lines that never reach the size threshold.
+    Blocks until a line is buffered — no wakeups while nothing is written.
+    """
+    while True:
+        _out_pending.wait()
+        time.sleep(_FLUSH_INTERVAL)  # Let the rest of a burst join the write
+        _out_pending.clear()
+        try:
+            flush_now()
+        except Exception:
+            pass
+
+
+threading.Thread(target=_flusher, daemon=True, name="StdoutFlusher").start()
+atexit.register(flush_now)  # sys.exit() paths
+
+
+# ── Progress file ────────────────────────────────
+# One append handle per process, opened on first use and closed at exit
+_progress_fh = None
+
+
+def _write_progress_line(line: bytes):
+    """Append one JSON line to the per-PID progress file polled by Electron."""
+    global _progress_fh
+    if _progress_fh is None:
+        import tempfile
+        progress_file = os.path.join(tempfile.gettempdir(), f"aurasplit_progress_{os.getpid()}.jsonl")
+        _progress_fh = open(progress_file, "ab")
+        atexit.register(_progress_fh.close)
+    _progress_fh.write(line + b"\n")
+    _progress_fh.flush()
+
+
+def shutdown_stdio():
+    """Flush everything, then close stdout so the Node.js reader gets EOF
+    right away (replaces the old fixed sleep(0.2) drain)."""
+    flush_now()
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    try:
+        sys.stdout.close()
+    except Exception:
+        pass
+
+
 def emit(msg_type: str, **kwargs):
     """JSON message to stdout → Electron captures via IPC.
     Each call outputs exactly ONE line of JSON (no embedded newlines).
     """
     payload = {"type": msg_type, **kwargs}
-    payload = _sanitize_for_json_line(payload)
-    line = json.dumps(payload, ensure_ascii=False)
-    line = line.replace('\n', ' ').replace('\r', '')
-    print(line, flush=True)
-    sys.stdout.flush()
+    line = _encode_line(_sanitize_for_json_line(payload))
+    urgent = msg_type != "log" and (msg_type != "progress" or kwargs.get("percent", 0) >= 100)
+    _write_line(line, urgent)
+
+
+def _fast_emit_result(data: dict):
+    """Emit a result whose strings are already single-line (no sanitize walk).
+    Written to BOTH stdout and the progress file for reliability.
+    """
+    result_line = _encode_line({"type": "result", "data": data})
+    # 1) Write to progress file (polled by Electron — proven reliable)
+    _write_progress_line(result_line)
+    # 2) Also write to stdout
+    _write_line(result_line, urgent=True)
 
 
 def emit_progress(percent: int, message: str = ""):
@@ -67,6 +230,29 @@ def emit_log(message: str):
     emit("log", message=message)
 
 
+def _make_clip_progress_log(phase_lo: int = 5, phase_hi: int = 30, clip_hi: int = 95):
+    """log_func for SK1/SK3: emit every line, and map [N/M] markers to progress.
+    Smart progress: distinguishes phase markers [1/3] (M <= 5 → phase_lo..phase_hi)
+    from clip progress [01/140] (→ phase_hi..clip_hi). Uses the LAST match.
+    """
+    phase_span = phase_hi - phase_lo
+    clip_span = clip_hi - phase_hi
+
+    def log_func(msg: str, _emit_log=emit_log, _emit_progress=emit_progress,
+                 _last=_last_progress):
+        _emit_log(msg)
+        progress = _last(msg)
+        if progress:
+            cur, total = progress
+            if total > 0:
+                if total <= 5:
+                    _emit_progress(min(int(phase_lo + (cur / total) * phase_span), phase_hi), msg)
+                else:
+                    _emit_progress(min(int(phase_hi + (cur / total) * clip_span), clip_hi), msg)
+
+    return log_func
+
+
 # ── SK1: AI Cut ──────────────────────────────────
 
 def run_sk1(config: dict):
@@ -96,23 +282,7 @@ def run_sk1(config: dict):
     model = config.get("model_name", "base")
     fast = config.get("fast_mode", False)
 
-    def log_func(msg: str):
-        emit_log(msg)
-        # Smart progress: distinguish phase markers [1/3] from clip progress [01/140]
-        import re
-        matches = re.findall(r'\[(\d+)/(\d+)\]', msg)
-        if matches:
-            # Use the LAST match (most specific)
-            cur, total = int(matches[-1][0]), int(matches[-1][1])
-            if total > 0:
-                if total <= 5:
-                    # Phase marker like [1/3], [2/3], [3/3] → map to 5-30% range
-                    phase_pct = int(5 + (cur / total) * 25)
-                    emit_progress(min(phase_pct, 30), msg)
-                else:
-                    # Per-clip progress like [01/140] → map to 30-95% range
-                    clip_pct = int(30 + (cur / total) * 65)
-                    emit_progress(min(clip_pct, 95), msg)
+    log_func = _make_clip_progress_log()
 
     emit_progress(5, f"Model: {model}, Language: {lang}")
     process_workflow(lang, model, log_func, fast_mode=fast)
@@ -161,10 +331,9 @@ def run_sub(config: dict):
 
     def log_func(msg: str):
         emit_log(msg)
-        import re
-        matches = re.findall(r'\[(\d+)/(\d+)\]', msg)
-        if matches:
-            cur, total = int(matches[-1][0]), int(matches[-1][1])
+        progress = _last_progress(msg)
+        if progress:
+            cur, total = progress
             if total > 0:
                 pct = int(5 + (cur / total) * 85)
                 emit_progress(min(pct, 90), msg)
@@ -194,41 +363,26 @@ def run_sub(config: dict):
             )
 
         # Convert segments — force native Python types (numpy float32 not JSON-serializable)
-        raw_segments = result.get("segments", [])[:50]
-        segments = []
-        for seg in raw_segments:
-            segments.append({
+        # Text is scrubbed here, once — the result skips the recursive sanitize
+        sanitize = _sanitize_for_json_line
+        segments = [
+            {
                 "start": float(seg.get("start", 0)),
                 "end": float(seg.get("end", 0)),
-                "text": str(seg.get("text", "")),
-            })
-
-        result_payload = {
-            "type": "result",
-            "data": {
-                "status": "ok",
-                "task": "sub",
-                "engine": result.get("engine", engine),
-                "language": str(result.get("language", "")),
-                "srt_path": str(result.get("srt_path", "")),
-                "segments_count": int(result.get("segments_count", 0)),
-                "segments": segments,
+                "text": sanitize(str(seg.get("text", ""))),
             }
-        }
-
-        # Write result to BOTH stdout and progress file for reliability
-        result_line = json.dumps(result_payload, ensure_ascii=False)
-        result_line = result_line.replace('\n', ' ').replace('\r', '')
-
-        # 1) Write to progress file (polled by Electron — proven reliable)
-        import tempfile
-        progress_file = os.path.join(tempfile.gettempdir(), f"aurasplit_progress_{os.getpid()}.jsonl")
-        with open(progress_file, "a", encoding="utf-8") as pf:
-            pf.write(result_line + "\n")
-
-        # 2) Also write to stdout
-        print(result_line, flush=True)
-        sys.stdout.flush()
+            for seg in result.get("segments", [])[:50]
+        ]
+
+        _fast_emit_result({
+            "status": "ok",
+            "task": "sub",
+            "engine": result.get("engine", engine),
+            "language": str(result.get("language", "")),
+            "srt_path": str(result.get("srt_path", "")),
+            "segments_count": int(result.get("segments_count", 0)),
+            "segments": segments,
+        })
 
         # Progress 100% sent LAST — acts as "delivery confirmation"
         emit_progress(100, "✅ SUB Complete!")
@@ -256,6 +410,7 @@ def run_sk3(config: dict):
         "model_cache_dir": config.get("model_cache_dir",
             os.path.join(_script_dir, "..", "models_ai")),
         "effect_type": config.get("effect_type", "kenburns"),
+        "fragmented_mp4": config.get("fragmented_mp4", False),
     }
     set_config(engine_config)
 
@@ -263,19 +418,7 @@ def run_sk3(config: dict):
     model = config.get("model_name", "base")
     fast = config.get("fast_mode", False)
 
-    def log_func(msg: str):
-        emit_log(msg)
-        import re
-        matches = re.findall(r'\[(\d+)/(\d+)\]', msg)
-        if matches:
-            cur, total = int(matches[-1][0]), int(matches[-1][1])
-            if total > 0:
-                if total <= 5:
-                    phase_pct = int(5 + (cur / total) * 25)
-                    emit_progress(min(phase_pct, 30), msg)
-                else:
-                    clip_pct = int(30 + (cur / total) * 65)
-                    emit_progress(min(clip_pct, 95), msg)
+    log_func = _make_clip_progress_log()
 
     emit_progress(5, f"Model: {model}, Language: {lang}")
     process_image_flow(lang, model, log_func, fast_mode=fast)
@@ -289,7 +432,6 @@ TASK_MAP = {"sk1": run_sk1, "sk3": run_sk3, "sub": run_sub}
 
 
 def main():
-    import time
     parser = argparse.ArgumentParser(description="AuraSplit v2 API Wrapper")
     parser.add_argument("--task", required=True, choices=list(TASK_MAP.keys()))
     parser.add_argument("--config", required=True, help="JSON config file path")
@@ -302,6 +444,8 @@ def main():
         emit("error", message=f"Config read failed: {e}")
         sys.exit(1)
 
+    _setup_hf_env()
+
     try:
         TASK_MAP[args.task](config)
     except Exception as e:
@@ -309,11 +453,7 @@ def main():
         traceback.print_exc(file=sys.stderr)
         sys.exit(1)
 
-    # Ensure all stdout is flushed before process exits
-    # (Node.js pipe reader needs time to drain the buffer)
-    sys.stdout.flush()
-    sys.stderr.flush()
-    time.sleep(0.2)
+    shutdown_stdio()
 
 
 if __name__ == "__main__":
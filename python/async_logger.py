@@ -15,12 +15,30 @@ _shutdown = False
 
 def _sanitize(value):
     """Remove newlines from strings for single-line JSON."""
+    # Fast path: clean strings and untouched containers are returned as-is
+    # (no new objects for the common log/progress payload)
     if isinstance(value, str):
+        if '\n' not in value and '\r' not in value:
+            return value.strip()
         return value.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ').strip()
     if isinstance(value, dict):
-        return {k: _sanitize(v) for k, v in value.items()}
+        out = None  # Copied on first change only
+        for k, v in value.items():
+            nv = _sanitize(v)
+            if nv is not v:
+                if out is None:
+                    out = dict(value)
+                out[k] = nv
+        return value if out is None else out
     if isinstance(value, list):
-        return [_sanitize(v) for v in value]
+        out = None
+        for i, v in enumerate(value):
+            nv = _sanitize(v)
+            if nv is not v:
+                if out is None:
+                    out = list(value)
+                out[i] = nv
+        return value if out is None else out
     return value
 
 
@@ -39,8 +57,8 @@ def _log_worker():
 
         try:
             payload = _sanitize(payload)
+            # json escapes \n / \r — the line needs no post-dumps scrub
             line = json.dumps(payload, ensure_ascii=False)
-            line = line.replace('\n', ' ').replace('\r', '')
             # Use print() — proven to work for stdout pipe to Electron
             print(line, flush=True)
         except Exception as e:
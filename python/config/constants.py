@@ -2,7 +2,9 @@
 # UI Constants for AuraSplit
 # ==============================================================================
 
-LANG_OPTIONS = [
+from types import MappingProxyType
+
+LANG_OPTIONS = (
     ("auto", "Auto (Detect)"),
     ("vi", "VI - Vietnamese"),
     ("en", "EN - English"),
@@ -14,9 +16,9 @@ LANG_OPTIONS = [
     ("ms", "MS - Malay"),
     ("fr", "FR - French"),
     ("de", "DE - German"),
-]
+)
 
-MODEL_OPTIONS = [
+MODEL_OPTIONS = (
     "LITE",
     "STARTER",
     "STANDARD",
@@ -24,10 +26,11 @@ MODEL_OPTIONS = [
     "ULTRA",
     "PREMIUM",
     "⚡ TURBO",
-]
+)
 
 # Model mapping: UI name -> actual WhisperX model name (hidden from users)
-MODEL_MAP = {
+# Read-only view — shared across threads, can't be mutated by accident
+MODEL_MAP = MappingProxyType({
     "LITE": "tiny",
     "STARTER": "base",
     "STANDARD": "small",
@@ -35,10 +38,12 @@ MODEL_MAP = {
     "ULTRA": "large-v2",
     "PREMIUM": "large-v3",
     "⚡ TURBO": "large-v3-turbo",
-}
+})
+if set(MODEL_MAP) != set(MODEL_OPTIONS):  # Not assert: stripped under -O
+    raise RuntimeError("MODEL_MAP / MODEL_OPTIONS out of sync")
 
 # UI friendly names (engine_merge/pipeline sẽ tự map về xfade)
-TRANSITION_OPTIONS = [
+TRANSITION_OPTIONS = (
     "Không",
     "Ngẫu nhiên",
     "Fade",
@@ -88,18 +93,18 @@ TRANSITION_OPTIONS = [
     "Reveal Right",
     "Reveal Up",
     "Reveal Down",
-]
+)
 
 # Final output presets
-FINAL_OUTPUT_OPTIONS = [
+FINAL_OUTPUT_OPTIONS = (
     "16:9 (1920x1080)",
     "16:9 (1280x720)",
     "9:16 (1080x1920)",
     "9:16 (720x1280)",
-]
+)
 
 # FX (VFX overlay / motion) - matching engine_fx.py effects
-FX_OPTIONS = [
+FX_OPTIONS = (
     "None",
     "Zoom Pulse",
     "Shake",
@@ -111,13 +116,13 @@ FX_OPTIONS = [
     "Cinematic",
     "Cinematic + Zoom",
     "Dreamy",
-]
+)
+
+
+# Helper: Map display label back to language code (inverse table built once)
+_LABEL_TO_CODE = {label: code for code, label in LANG_OPTIONS}
 
 
-# Helper: Map display label back to language code
 def _get_lang_code(display_label: str) -> str:
     """Convert display label (VI - Vietnamese) to code (vi)"""
-    for code, label in LANG_OPTIONS:
-        if label == display_label:
-            return code
-    return "auto"  # fallback
+    return _LABEL_TO_CODE.get(display_label, "auto")  # fallback: auto
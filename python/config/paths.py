@@ -22,19 +22,19 @@ def _get_app_model_dir():
         # For config module, go up one level to get project root
         script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-    # Check if DEV mode: models_ai folder exists next to script
+    # Check if DEV mode: models_ai folder exists next to script (one stat)
     local_models = os.path.join(script_dir, "models_ai")
-    if os.path.exists(local_models):
-        _CACHED_MODEL_DIR = local_models
-        return _CACHED_MODEL_DIR
-
-    # Customer: use AppData (writable location)
-    appdata = os.environ.get("LOCALAPPDATA", "")
-    if appdata:
-        model_dir = os.path.join(appdata, "AuraSplit", "models")
-    else:
-        model_dir = os.path.join(os.path.expanduser("~"), ".aurasplit", "models")
+    try:
+        os.stat(local_models)
+        model_dir = local_models
+    except OSError:
+        # Customer: use AppData (writable location)
+        appdata = os.environ.get("LOCALAPPDATA", "")
+        if appdata:
+            model_dir = os.path.join(appdata, "AuraSplit", "models")
+        else:
+            model_dir = os.path.join(os.path.expanduser("~"), ".aurasplit", "models")
+        os.makedirs(model_dir, exist_ok=True)
 
-    os.makedirs(model_dir, exist_ok=True)
     _CACHED_MODEL_DIR = model_dir
     return _CACHED_MODEL_DIR
@@ -3,7 +3,10 @@
 # ==============================================================================
 
 import os
+import json
+import shutil
 import subprocess
+import time
 from functools import lru_cache
 
 import safe_kernel
@@ -12,6 +15,16 @@ from core.exceptions import StopRequestedError, FFmpegError
 # FFmpeg threading optimization - use all CPU cores
 FFMPEG_THREADS = ["-threads", "0"]
 
+# Clips cut concurrently by the SK1/SK3 loops on the GPU encoder. Kept at 2:
+# older consumer NVIDIA drivers cap NVENC at 2 concurrent sessions.
+FFMPEG_MAX_PARALLEL = max(1, min(2, os.cpu_count() or 1))
+
+
+def ffmpeg_max_parallel(enc_name: str) -> int:
+    """Concurrent clip encodes for enc_name. libx264 runs one at a time —
+    each process already spreads over every core (-threads 0)."""
+    return 1 if enc_name == "libx264" else FFMPEG_MAX_PARALLEL
+
 # Module-level stop flag (will be synced with main)
 _STOP_FLAG = False
 
@@ -26,7 +39,11 @@ def run_ffmpeg_fast(cmd_list):
     """Execute FFmpeg command with stop signal support."""
     if _STOP_FLAG:
         raise StopRequestedError("User stopped the operation")
+    _execute(cmd_list)
 
+
+def _execute(cmd_list):
+    """safe_kernel.execute_safe with errors mapped to core exceptions."""
     # Auto-create output directory if needed
     # The last argument is typically the output file
     if len(cmd_list) > 1:
@@ -44,12 +61,103 @@ def run_ffmpeg_fast(cmd_list):
         raise FFmpegError(f"FFmpeg command failed: {e}")
 
 
+# ==============================================================================
+# On-disk probe cache — api_wrapper is spawned per task, so lru_cache alone
+# re-ran both ffmpeg probes on every Start. Results are keyed by GPU UUID +
+# driver version + ffmpeg binary, so a driver/GPU/ffmpeg change re-probes.
+# A True result is kept; a False one (NVENC sessions busy, VRAM held by a
+# loaded model, ...) may be transient, so it expires after _PROBE_FALSE_TTL.
+# ==============================================================================
+
+_PROBE_FALSE_TTL = 600  # seconds
+
+def _probe_cache_path():
+    appdata = os.environ.get("LOCALAPPDATA", "")
+    if appdata:
+        return os.path.join(appdata, "AuraSplit", "probe_cache.json")
+    return os.path.join(os.path.expanduser("~"), ".aurasplit", "probe_cache.json")
+
+
+@lru_cache(maxsize=1)
+def _probe_cache_key():
+    """GPU uuid/driver (nvidia-smi) + ffmpeg path/mtime. Cached per process."""
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", "--query-gpu=uuid,driver_version", "--format=csv,noheader"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=5,
+            creationflags=subprocess.CREATE_NO_WINDOW,
+        )
+        gpu = result.stdout.decode("utf-8", "replace").strip() if result.returncode == 0 else "nogpu"
+    except Exception:
+        gpu = "nogpu"
+    ffmpeg = shutil.which("ffmpeg") or "ffmpeg"
+    try:
+        ffmpeg_mtime = int(os.path.getmtime(ffmpeg))
+    except OSError:
+        ffmpeg_mtime = 0
+    return f"{gpu}|{ffmpeg}|{ffmpeg_mtime}"
+
+
+def _get_cached_probe(name):
+    """Return the cached bool for probe `name`, or None on miss/expired False."""
+    try:
+        with open(_probe_cache_path(), "r", encoding="utf-8") as f:
+            entry = json.load(f).get(_probe_cache_key(), {})
+    except (OSError, ValueError, AttributeError):
+        return None
+    value = entry.get(name) if isinstance(entry, dict) else None
+    if value is True:
+        return True
+    # False is stored with its probe time: [false, unix_time]
+    if (isinstance(value, list) and len(value) == 2 and value[0] is False
+            and isinstance(value[1], (int, float))
+            and 0 <= time.time() - value[1] < _PROBE_FALSE_TTL):
+        return False
+    return None
+
+
+def _set_cached_probe(name, value):
+    path = _probe_cache_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            data = {}
+    except (OSError, ValueError):
+        data = {}
+    # Only the current key is kept — stale GPU/driver entries are dropped
+    key = _probe_cache_key()
+    entry = data.get(key) if isinstance(data.get(key), dict) else {}
+    entry[name] = True if value else [False, time.time()]
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({key: entry}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # Cache is best-effort
+
+
 @lru_cache(maxsize=1)
 def check_cuda_decode_available():
     """
     Check if CUDA hardware decode is available.
-    Cached - only checks once per session.
+    Cached - once per session, and on disk across sessions.
     """
+    cached = _get_cached_probe("cuda_decode")
+    if cached is not None:
+        return cached
+    result = _probe_cuda_decode()
+    if result is None:
+        return False  # Timeout — don't persist a transient failure
+    _set_cached_probe("cuda_decode", result)
+    return result
+
+
+def _probe_cuda_decode():
     try:
         # Test simple CUDA decode with a synthetic source
         test_cmd = [
@@ -66,6 +174,8 @@ def check_cuda_decode_available():
             creationflags=subprocess.CREATE_NO_WINDOW,  # CRITICAL for PyInstaller
         )
         return result.returncode == 0
+    except subprocess.TimeoutExpired:
+        return None
     except Exception:
         return False
 
@@ -86,8 +196,8 @@ def get_hwaccel_flags():
     return []
 
 
-def get_best_encoder(log_func=None):
-    """Chọn encoder tốt nhất: ưu tiên NVENC nếu khả dụng, fallback libx264."""
+def _probe_nvenc():
+    """Run the NVENC test encode. True/False, or None on timeout (not cached)."""
     try:
         test_cmd = [
             "ffmpeg",
@@ -112,18 +222,29 @@ def get_best_encoder(log_func=None):
             timeout=10,  # Add timeout for safety
             creationflags=subprocess.CREATE_NO_WINDOW,  # CRITICAL for PyInstaller
         )
-        if result.returncode == 0:
-            if log_func:
-                hwaccel = "+" if check_cuda_decode_available() else ""
-                log_func(f"🚀 TURBO MODE: NVENC{hwaccel} (GPU)!")
-            return "h264_nvenc", "p1"  # p1 = fastest encoding
-        else:
+        return result.returncode == 0
+    except subprocess.TimeoutExpired:
+        return None
+    except Exception:
+        return False
+
+
+def get_best_encoder(log_func=None):
+    """Chọn encoder tốt nhất: ưu tiên NVENC nếu khả dụng, fallback libx264."""
+    nvenc = _get_cached_probe("nvenc")
+    if nvenc is None:
+        nvenc = _probe_nvenc()
+        if nvenc is None:
             if log_func:
-                log_func("🛡️ SAFE MODE: Chạy CPU (libx264).")
+                log_func("⚠️ Encoder probe timeout, using CPU fallback.")
             return "libx264", "ultrafast"
-    except subprocess.TimeoutExpired:
+        _set_cached_probe("nvenc", nvenc)
+
+    if nvenc:
         if log_func:
-            log_func("⚠️ Encoder probe timeout, using CPU fallback.")
-        return "libx264", "ultrafast"
-    except Exception:
-        return "libx264", "ultrafast"
+            hwaccel = "+" if check_cuda_decode_available() else ""
+            log_func(f"🚀 TURBO MODE: NVENC{hwaccel} (GPU)!")
+        return "h264_nvenc", "p1"  # p1 = fastest encoding
+    if log_func:
+        log_func("🛡️ SAFE MODE: Chạy CPU (libx264).")
+    return "libx264", "ultrafast"
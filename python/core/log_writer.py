@@ -0,0 +1,72 @@
+# ==============================================================================
+# Background file writer for AuraSplit engines
+# Debug-log lines and progress-file JSON lines are queued here and written by
+# one daemon thread, so the cutting / image-flow loop never waits on disk.
+# ==============================================================================
+
+import atexit
+import queue
+import threading
+
+_QUEUE_MAX = 4096
+_FLUSH_TIMEOUT = 0.2  # Idle flush — nothing sits in a buffer longer than this
+
+_queue: queue.Queue = queue.Queue(maxsize=_QUEUE_MAX)
+
+
+def _worker():
+    """Daemon thread: write queued text, flush whenever the queue goes idle."""
+    dirty = set()
+    while True:
+        try:
+            fh, text, urgent = _queue.get(timeout=_FLUSH_TIMEOUT)
+        except queue.Empty:
+            _flush_all(dirty)
+            continue
+        try:
+            fh.write(text)
+            dirty.add(fh)
+            if urgent or _queue.empty():
+                _flush_all(dirty)
+        except Exception:
+            dirty.discard(fh)  # Closed/broken handle — drop the line
+        finally:
+            _queue.task_done()
+
+
+def _flush_all(dirty):
+    for fh in dirty:
+        try:
+            fh.flush()
+        except Exception:
+            pass
+    dirty.clear()
+
+
+_worker_thread = threading.Thread(target=_worker, daemon=True, name="FileLogWriter")
+_worker_thread.start()
+
+
+def submit(fh, text, urgent: bool = False, block: bool = False) -> bool:
+    """Queue text (str, or bytes for a binary fh) for fh.
+    block=False drops the line when the queue is full
+    (debug log backpressure); block=True waits for room (UI progress lines).
+    urgent=True flushes fh right after the write. Returns False if dropped.
+    """
+    item = (fh, text, urgent)
+    if block:
+        _queue.put(item)
+        return True
+    try:
+        _queue.put_nowait(item)
+        return True
+    except queue.Full:
+        return False
+
+
+def drain():
+    """Block until every queued line is written and flushed."""
+    _queue.join()
+
+
+atexit.register(drain)
@@ -0,0 +1,110 @@
+# ==============================================================================
+# On-disk cache for _match_words_to_script results
+# Re-cutting the same audio against the same script skips the word/script
+# alignment entirely. One small JSON file per key, oldest evicted first.
+# The matcher's log lines (per-item skip warnings) are stored with the
+# matches and replayed on a hit, so warm runs log the same as cold ones.
+# ==============================================================================
+
+import os
+import json
+import hashlib
+from typing import Callable, List, Optional, Tuple
+
+import _seq
+
+MAX_ENTRIES = 32  # Bounds disk use — FIFO by file mtime
+
+
+def _cache_dir(cache_root: str) -> str:
+    return os.path.join(cache_root, "match_cache")
+
+
+def _algo_tag() -> str:
+    """Matcher build + scorer backend — a new _seq build invalidates old entries."""
+    try:
+        st = os.stat(_seq.__file__)
+        build = f"{st.st_size}:{st.st_mtime_ns}"
+    except (OSError, TypeError):
+        build = "?"
+    scorer = "difflib" if _seq._rf_ratio is None else "rapidfuzz"
+    return f"{build}|{scorer}"
+
+
+def _match_key(all_words: List[dict], script_items: List[Tuple[int, str]]) -> str:
+    words = [
+        (w.get("word", ""), round(w.get("start", 0.0), 3), round(w.get("end", 0.0), 3))
+        for w in all_words
+    ]
+    blob = json.dumps([_algo_tag(), script_items, words], ensure_ascii=False)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _load(path: str) -> Optional[Tuple[List[Tuple[int, float, float, str]], List[str]]]:
+    """(matches, warnings), or None on miss. Entries without stored warnings
+    (older list-only format) count as a miss and are rewritten."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return [tuple(m) for m in data["matches"]], [str(w) for w in data["warnings"]]
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+
+def _store(cache_dir: str, path: str, matches, warnings: List[str]) -> None:
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"matches": matches, "warnings": warnings}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        _evict(cache_dir)
+    except OSError:
+        pass  # Cache is best-effort
+
+
+def _evict(cache_dir: str) -> None:
+    entries = [e for e in os.scandir(cache_dir) if e.name.endswith(".json")]
+    if len(entries) <= MAX_ENTRIES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for e in entries[:len(entries) - MAX_ENTRIES]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
+
+
+def match_words_to_script_cached(
+    all_words: List[dict],
+    script_items: List[Tuple[int, str]],
+    log_func: Optional[Callable[[str], None]],
+    cache_root: str,
+) -> List[Tuple[int, float, float, str]]:
+    """_match_words_to_script, memoized on disk under cache_root/match_cache."""
+    try:
+        key = _match_key(all_words, script_items)
+    except (TypeError, ValueError):
+        return _seq._match_words_to_script(all_words, script_items, log_func)
+
+    cache_dir = _cache_dir(cache_root)
+    path = os.path.join(cache_dir, key + ".json")
+    cached = _load(path)
+    if cached is not None:
+        matches, warnings = cached
+        if log_func:
+            for msg in warnings:
+                log_func(msg)
+            log_func(f"      > Match cache hit: {len(matches)} clips")
+        return matches
+
+    warnings: List[str] = []
+
+    def _record(msg: str) -> None:
+        warnings.append(msg)
+        if log_func:
+            log_func(msg)
+
+    matches = _seq._match_words_to_script(all_words, script_items, _record)
+    _store(cache_dir, path, matches, warnings)
+    return matches
@@ -0,0 +1,215 @@
+# ==============================================================================
+# Shared helpers for the SK1 (cutting) and SK3 (image flow) engines
+# One copy of the app-root / ffmpeg lookups, debug log and progress-file
+# helpers — both engines import from here instead of carrying duplicates.
+# ==============================================================================
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import atexit
+import datetime
+import threading
+from functools import lru_cache
+
+try:
+    import orjson  # Optional: C encoder, returns UTF-8 bytes directly
+except ImportError:
+    orjson = None
+
+from core import log_writer
+
+_log_lock = threading.Lock()  # One lock for every engine's debug log handle
+_DEBUG_FLUSH_PREFIXES = ("FATAL", "[CRASH", "[ERROR")
+
+
+@lru_cache(maxsize=None)  # Answers can't change mid-process — computed once
+def is_frozen() -> bool:
+    """Check if running as compiled EXE (Nuitka/PyInstaller).
+    Uses multiple detection methods for reliability.
+    """
+    # Method 1: PyInstaller sets sys.frozen
+    if getattr(sys, 'frozen', False):
+        return True
+    # Method 2: Check if running from .exe
+    if sys.executable.lower().endswith('.exe'):
+        # Exclude python.exe from venv
+        exe_name = os.path.basename(sys.executable).lower()
+        if exe_name not in ('python.exe', 'pythonw.exe'):
+            return True
+    # Method 3: Check for _MEIPASS (PyInstaller temp folder)
+    if hasattr(sys, '_MEIPASS'):
+        return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def _get_app_root() -> str:
+    """Get application root directory."""
+    if is_frozen():
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _find_app_exe(name: str) -> str:
+    """Absolute path to <name>.exe in the app root or _internal, else bare name (PATH)."""
+    app_root = _get_app_root()
+    # Check root first (where we copied it)
+    exe_path = os.path.join(app_root, f"{name}.exe")
+    if os.path.exists(exe_path):
+        return exe_path
+    # Fallback to _internal
+    exe_path = os.path.join(app_root, "_internal", f"{name}.exe")
+    if os.path.exists(exe_path):
+        return exe_path
+    # Last resort: assume it's in PATH
+    return name
+
+
+@lru_cache(maxsize=None)
+def _get_ffmpeg_path() -> str:
+    """Get absolute path to ffmpeg.exe (AI Studio Fix #3)."""
+    return _find_app_exe("ffmpeg")
+
+
+@lru_cache(maxsize=None)
+def _get_ffprobe_path() -> str:
+    """Get absolute path to ffprobe.exe."""
+    return _find_app_exe("ffprobe")
+
+
+def _preload_ai_modules():
+    """DEV mode: import torch + whisperx on a daemon thread so the multi-second
+    import overlaps workflow setup. Returns the thread (or None in EXE mode)."""
+    if is_frozen():
+        return None
+
+    def _load():
+        try:
+            import torch  # noqa: F401
+            import whisperx  # noqa: F401
+        except Exception:
+            pass  # The main thread's own import reports the real error
+
+    t = threading.Thread(target=_load, daemon=True, name="AIPreload")
+    t.start()
+    return t
+
+
+# Directories already created this process — the cutting loop writes every
+# clip into the same audios/ + videos/ folders, so skip the repeat mkdir.
+_MKDIR_CACHE: set = set()
+
+
+def _makedirs_once(path: str) -> None:
+    """os.makedirs(exist_ok=True), but only the first time per directory."""
+    if path not in _MKDIR_CACHE:
+        os.makedirs(path, exist_ok=True)
+        _MKDIR_CACHE.add(path)
+
+
+# ==============================================================================
+# DEBUG LOG: one file per engine (sk1_debug.log / sk3_debug.log)
+# ==============================================================================
+
+class _DebugLog:
+    """Persistent buffered debug log; lines are written by core.log_writer."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path = None
+        self._fh = None
+        self._atexit_registered = False
+
+    def init(self):
+        """Initialize debug log file in app directory."""
+        try:
+            if getattr(sys, 'frozen', False):
+                base_dir = os.path.dirname(os.path.abspath(sys.executable))
+            else:
+                base_dir = os.path.dirname(os.path.abspath(__file__))
+            self.path = os.path.join(base_dir, f"{self.name}_debug.log")
+            with _log_lock:
+                if self._fh is not None:
+                    log_writer.drain()
+                    self._fh.close()
+                if not self._atexit_registered:
+                    atexit.register(self.close)
+                    self._atexit_registered = True
+                # One handle per run (was open/write/close per message)
+                self._fh = open(self.path, "w", encoding="utf-8", buffering=1 << 15)
+                self._fh.write(f"=== {self.name.upper()} DEBUG LOG - {datetime.datetime.now()} ===\n")
+        except Exception:
+            pass
+
+    def log(self, msg: str):
+        """Queue a line for the debug log file (written off-thread, FIFO)."""
+        fh = self._fh
+        if fh is not None:
+            # Crash/error lines are flushed right after they are written;
+            # on a full queue the line is dropped rather than blocking the caller
+            log_writer.submit(fh, msg + "\n", urgent=msg.startswith(_DEBUG_FLUSH_PREFIXES))
+
+    def close(self):
+        """Flush + close the debug log handle (atexit)."""
+        log_writer.drain()
+        with _log_lock:
+            if self._fh is not None:
+                try:
+                    self._fh.close()
+                except Exception:
+                    pass
+                self._fh = None
+
+
+_DEBUG_LOGS = {}
+
+
+def get_debug_logger(name: str) -> _DebugLog:
+    """Debug log for engine `name` ("sk1" → sk1_debug.log). One per name."""
+    with _log_lock:
+        logger = _DEBUG_LOGS.get(name)
+        if logger is None:
+            logger = _DEBUG_LOGS[name] = _DebugLog(name)
+        return logger
+
+
+# ==============================================================================
+# PROGRESS FILE (JSONL IPC read by Electron)
+# ==============================================================================
+
+def _flush_and_stop(progress_fh=None):
+    """Drain queued debug/progress lines to disk, then close the progress file."""
+    log_writer.drain()
+    if progress_fh is not None:
+        try:
+            progress_fh.close()
+        except Exception:
+            pass
+
+
+def _single_line(text: str) -> str:
+    """Collapse CR/LF to spaces for a one-line JSON value. Clean strings (the
+    common case) take a single scan; '\r\n' still becomes ONE space."""
+    if '\n' not in text and '\r' not in text:
+        return text.strip()
+    return text.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ').strip()
+
+
+def _encode_line(payload) -> bytes:
+    """One JSONL line as UTF-8 bytes — orjson when available, else stdlib."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass  # Type orjson can't encode — stdlib json below
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _decode_json(data):
+    """Parse JSON bytes/str — orjson when available, else stdlib."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,277 @@
+# ==============================================================================
+# SK3 helpers kept out of sk3_image_flow.py (file-size rule)
+# Visual-file probing, batched audio cutting, and the encoder failover +
+# bounded clip pool used by _image_flow_loop. All subprocess work stays in
+# .py (same reason as the LOCAL OVERRIDES in sk3_image_flow.py).
+# ==============================================================================
+
+from __future__ import annotations
+
+import os
+import sys
+import subprocess
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from engines._engine_utils import _get_ffprobe_path, _decode_json
+
+# Windows subprocess flags to prevent CMD window flashing
+if sys.platform == "win32":
+    _SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW
+    _STARTUPINFO = subprocess.STARTUPINFO()
+    _STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _STARTUPINFO.wShowWindow = subprocess.SW_HIDE
+else:
+    _SUBPROCESS_FLAGS = 0
+    _STARTUPINFO = None
+
+
+_IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp', '.gif', '.tif', '.tiff'}
+_VIDEO_EXTS = {'.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v'}
+
+_PROBE_CACHE: dict = {}  # (path, mtime_ns, size) -> bool — round-robin re-picks files
+
+
+def _ffprobe_has_video_stream(path: str) -> bool:
+    """LOCAL OVERRIDE — check if file has video stream.
+    v5.9.26: Moved from process_task.pyd to .py to avoid subprocess crash.
+    Images are probed in-process (Pillow header) when Pillow is installed;
+    videos, and anything Pillow can't confirm, go to ffprobe.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    key = (path, st.st_mtime_ns, st.st_size)
+    ok = _PROBE_CACHE.get(key)
+    if ok is None:
+        ok = _probe_in_process(path) or _ffprobe_subprocess(path)
+        _PROBE_CACHE[key] = ok
+    return ok
+
+
+def _probe_in_process(path: str) -> bool:
+    """True if Pillow reads a non-empty image header; False = unknown.
+    Images only: videos stay on the ffprobe subprocess, so a demuxer crash
+    on user media can't take down the engine (and no second set of FFmpeg
+    DLLs is loaded next to safe_kernel's). Pillow is imported lazily.
+    """
+    if os.path.splitext(path)[1].lower() not in _IMAGE_EXTS:
+        return False
+    try:
+        from PIL import Image  # Optional: header-only image probe
+    except ImportError:
+        return False
+    try:
+        with Image.open(path) as im:  # Header only, no pixel decode
+            w, h = im.size
+        return w > 0 and h > 0
+    except Exception:
+        return False
+
+
+def _ffprobe_video_size(path: str, timeout=None) -> Tuple[int, int]:
+    """(width, height) of the first video stream via ffprobe; (0, 0) if none.
+    Subprocess errors (e.g. timeout) propagate to the caller.
+    """
+    cp = subprocess.run(
+        [
+            _get_ffprobe_path(),
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height",
+            "-of", "json",
+            path,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout,
+        creationflags=_SUBPROCESS_FLAGS,
+        startupinfo=_STARTUPINFO,
+    )
+    if cp.returncode != 0 or not cp.stdout:
+        return 0, 0
+    streams = _decode_json(cp.stdout).get("streams") or [{}]
+    return int(streams[0].get("width") or 0), int(streams[0].get("height") or 0)
+
+
+def _ffprobe_subprocess(path: str) -> bool:
+    try:
+        w, h = _ffprobe_video_size(path)
+        return w > 0 and h > 0
+    except Exception:
+        return False
+
+
+_PROBE_WINDOW = 8  # Probes in flight at once during the startup scan
+
+
+def _first_readable_index(
+    files: List[str],
+    mark: Optional[Callable[[str], None]] = None,
+) -> Optional[int]:
+    """Index of the first file with a readable video stream, or None.
+    Files are probed a window at a time on threads (each ffprobe is its own
+    process, so they overlap); the scan stops at the first window with a hit.
+    mark(step) gets a crash marker naming each window's files before it runs.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=_PROBE_WINDOW, thread_name_prefix="Probe") as pool:
+        for base in range(0, len(files), _PROBE_WINDOW):
+            window = files[base:base + _PROBE_WINDOW]
+            if mark is not None:
+                names = ", ".join(os.path.basename(p) for p in window)
+                mark(f"SK3-I-{base}: ffprobe checking [{base}..{base + len(window) - 1}]: {names}")
+            for i, ok in enumerate(pool.map(_ffprobe_has_video_stream, window)):
+                if ok:
+                    return base + i
+    return None
+
+
+_AUDIO_BATCH = 16  # Audio clips per FFmpeg process in _image_flow_loop
+
+
+def _audio_cut_cmd(s_time: float, e_time: float, audio_path: str, a_out: str) -> List[str]:
+    return [
+        "ffmpeg", "-y",
+        "-ss", str(s_time),
+        "-to", str(e_time),
+        "-i", audio_path,
+        "-vn", "-acodec", "libmp3lame",
+        "-q:a", "2",
+        "-loglevel", "error",
+        a_out,
+    ]
+
+
+def _cut_audio_batch(batch, audio_path, out_aud, ffmpeg_runner, stop_check) -> dict:
+    """Cut the audio for a batch of matches with ONE FFmpeg process.
+    The source is seeked once to the earliest start and decoded once; each
+    clip is its own output with output-side -ss/-to (sample-accurate trim).
+    If the batch run fails, falls back to one re-encoding process per clip
+    so only the broken clips fail. Returns {vid: exception} for failures.
+    """
+    jobs = [
+        (vid, s_time, e_time, os.path.join(out_aud, f"{str(vid).zfill(3)}.mp3"))
+        for vid, s_time, e_time, _ in batch
+    ]
+    # MP3 source → copy its frames (no lossy re-encode, no encoder init);
+    # cut points snap to MP3 frame boundaries (~26 ms)
+    if audio_path.lower().endswith(".mp3"):
+        codec = ["-c:a", "copy"]
+    else:
+        codec = ["-acodec", "libmp3lame", "-q:a", "2"]
+    if len(jobs) > 1 or codec[-1] == "copy":
+        base = min(s for _, s, _, _ in jobs)
+        cmd = ["ffmpeg", "-y", "-loglevel", "error", "-ss", str(base), "-i", audio_path]
+        for _, s_time, e_time, a_out in jobs:
+            cmd += [
+                "-ss", str(s_time - base),
+                "-to", str(e_time - base),
+                "-vn", *codec,
+                a_out,
+            ]
+        try:
+            ffmpeg_runner(cmd)
+            return {}
+        except Exception as batch_err:
+            if stop_check():
+                return {vid: batch_err for vid, _, _, _ in jobs}
+
+    errors = {}
+    for vid, s_time, e_time, a_out in jobs:
+        try:
+            ffmpeg_runner(_audio_cut_cmd(s_time, e_time, audio_path, a_out))
+        except Exception as audio_err:
+            errors[vid] = audio_err
+    return errors
+
+
+_HW_ENCODER_MAX_FAILS = 2  # GPU-encoder-only failures before a run goes libx264-only
+
+
+class _EncoderFailover:
+    """GPU encoder with a per-clip libx264 retry.
+    Clips where the GPU encoder failed but libx264 succeeded are the
+    encoder's fault, not the input's; after _HW_ENCODER_MAX_FAILS of them
+    the rest of the run goes straight to libx264. Thread-safe.
+    """
+
+    def __init__(self, enc_name: str, enc_preset: str, log_func: Callable[[str], None]):
+        self.enc_name = enc_name
+        self.enc_preset = enc_preset
+        self.log_func = log_func
+        self.ok = True
+        self.fails = 0
+        self._lock = threading.Lock()
+
+    def run(self, make_clip: Callable[[str, str], None]) -> None:
+        """make_clip(enc_name, enc_preset); a libx264 failure propagates."""
+        if self.ok:
+            try:
+                make_clip(self.enc_name, self.enc_preset)
+                return
+            except Exception:
+                pass
+        # Fallback: use software encoder
+        make_clip("libx264", "ultrafast")
+        if self.enc_name != "libx264":
+            with self._lock:
+                self.fails += 1
+                if self.ok and self.fails >= _HW_ENCODER_MAX_FAILS:
+                    self.ok = False
+                    self.log_func(f"⚠️ {self.enc_name} failed {self.fails}x, using libx264 for remaining clips")
+
+
+class _ClipPool:
+    """At most max_workers clip jobs in flight; max_workers <= 1 runs each
+    job inline on the caller's thread. A pool job's error is re-raised by
+    close() once the in-flight jobs have finished.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.done = 0  # Jobs that finished without error
+        self.error = None
+        self._pending = set()
+        self._pool = None
+        if max_workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ImageClip")
+
+    def submit(self, fn, *args) -> bool:
+        """Run fn(*args), waiting for a free slot first.
+        False = an earlier job failed: stop submitting and call close().
+        """
+        if self._pool is None:
+            fn(*args)
+            self.done += 1
+            return True
+        if len(self._pending) >= self.max_workers:
+            from concurrent.futures import wait, FIRST_COMPLETED
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            self._collect(done)
+            if self.error is not None:
+                return False
+        self._pending.add(self._pool.submit(fn, *args))
+        return True
+
+    def close(self) -> int:
+        """Wait for in-flight jobs; return the done count or raise the first error."""
+        if self._pool is not None:
+            from concurrent.futures import wait
+            self._collect(wait(self._pending).done)
+            self._pending = set()
+            self._pool.shutdown()
+            if self.error is not None:
+                raise self.error
+        return self.done
+
+    def _collect(self, done) -> None:
+        for fut in done:
+            try:
+                fut.result()
+                self.done += 1
+            except BaseException as e:  # Re-raised by close()
+                if self.error is None:
+                    self.error = e
@@ -8,16 +8,26 @@ from __future__ import annotations
 import os
 import re
 import sys
-import json
 import subprocess
 import tempfile
 import datetime
+from functools import lru_cache, partial
+from itertools import chain
 from typing import Callable, List, Optional, Tuple
 
-# DEBUG: Write all log output to file for crash analysis
-DEBUG_LOG_PATH = None
 import threading
-_log_lock = threading.Lock()  # Thread-safe logging to prevent garbled output
+
+from engines._engine_utils import (
+    is_frozen, _get_app_root, _get_ffmpeg_path, _preload_ai_modules,
+    _MKDIR_CACHE, _makedirs_once,
+    _flush_and_stop, _single_line, _encode_line,
+    get_debug_logger,
+)
+
+# DEBUG: Write all log output to file for crash analysis
+_DEBUG_LOG = get_debug_logger("sk1")
+_init_debug_log = _DEBUG_LOG.init
+_debug_log = _DEBUG_LOG.log
 
 # ==============================================================================
 # NOISE FILTER: Suppress 3rd-party library messages from subprocess output
@@ -52,76 +62,50 @@ _NOISE_PATTERNS = [
     "checkpoint of a model trained on another task",
 ]
 
-def _is_noise(line: str) -> bool:
-    """Check if a line matches noise patterns and should be filtered."""
-    return any(pattern in line for pattern in _NOISE_PATTERNS)
-
-def _init_debug_log():
-    """Initialize debug log file in app directory."""
-    global DEBUG_LOG_PATH
-    try:
-        if getattr(sys, 'frozen', False):
-            base_dir = os.path.dirname(os.path.abspath(sys.executable))
-        else:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-        DEBUG_LOG_PATH = os.path.join(base_dir, "sk1_debug.log")
-        with _log_lock:
-            with open(DEBUG_LOG_PATH, "w", encoding="utf-8") as f:
-                f.write(f"=== SK1 DEBUG LOG - {datetime.datetime.now()} ===\n")
-    except Exception:
-        pass
-
-def _debug_log(msg: str):
-    """Write to debug log file (thread-safe)."""
-    global DEBUG_LOG_PATH
-    if DEBUG_LOG_PATH:
-        try:
-            with _log_lock:  # Ensure only one thread writes at a time
-                with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                    f.write(f"{msg}\n")
-        except Exception:
-            pass
-
-
-def is_frozen() -> bool:
-    """Check if running as compiled EXE (Nuitka/PyInstaller).
-    Uses multiple detection methods for reliability.
-    """
-    # Method 1: PyInstaller sets sys.frozen
-    if getattr(sys, 'frozen', False):
-        return True
-    # Method 2: Check if running from .exe
-    if sys.executable.lower().endswith('.exe'):
-        # Exclude python.exe from venv
-        exe_name = os.path.basename(sys.executable).lower()
-        if exe_name not in ('python.exe', 'pythonw.exe'):
+# One pass over the line for all patterns (was one `in` scan per pattern):
+# Aho-Corasick when pyahocorasick is installed, else one compiled alternation
+try:
+    import ahocorasick
+    _NOISE_AC = ahocorasick.Automaton()
+    for _pat in _NOISE_PATTERNS:
+        _NOISE_AC.add_word(_pat, _pat)
+    _NOISE_AC.make_automaton()
+except ImportError:
+    _NOISE_AC = None
+_NOISE_RE = re.compile("|".join(map(re.escape, _NOISE_PATTERNS)))
+
+def _match_noise(line: str) -> bool:
+    if _NOISE_AC is not None:
+        for _ in _NOISE_AC.iter(line):
             return True
-    # Method 3: Check for _MEIPASS (PyInstaller temp folder)
-    if hasattr(sys, '_MEIPASS'):
-        return True
-    return False
+        return False
+    return _NOISE_RE.search(line) is not None
 
+# Workers repeat the same warning lines many times — memoize short lines;
+# long ones (progress dumps, tracebacks) are rarely repeated, skip the cache
+_match_noise_cached = lru_cache(maxsize=4096)(_match_noise)
 
-def _get_app_root() -> str:
-    """Get application root directory."""
-    if is_frozen():
-        return os.path.dirname(sys.executable)
-    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+def _is_noise(line: str) -> bool:
+    """Check if a line matches noise patterns and should be filtered."""
+    if len(line) > 512:
+        return _match_noise(line)
+    return _match_noise_cached(line)
 
 # Core imports
 from config.paths import _get_app_model_dir
 from core.exceptions import StopRequestedError
 from core.model_manager import (
     MODEL_CACHE, KEEP_MODEL_LOADED,
-    aggressive_gc, check_vram_available
+    aggressive_gc, check_vram_available, pick_compute_type
 )
-from core.ffmpeg import FFMPEG_THREADS, get_best_encoder
+from core.ffmpeg import FFMPEG_THREADS, ffmpeg_max_parallel, get_best_encoder
+from core import log_writer
+from core.match_cache import match_words_to_script_cached
 
 import safe_kernel
 
 # === PROTECTED IMPORTS from process_task.pyd (Thin Wrapper v5.9.24) ===
 from process_task import (
-    _match_words_to_script,
     _extract_words_with_fallback as _extract_words_core,
     _clean_text as clean_text,
     _parse_script as parse_script,
@@ -187,44 +171,30 @@ def _ensure_out_dirs() -> Tuple[str, str]:
     """Create output directories. Uses CONFIG global — stays in wrapper."""
     out_aud = os.path.join(CONFIG["output_dir"], "audios")
     out_vid = os.path.join(CONFIG["output_dir"], "videos")
-    os.makedirs(out_aud, exist_ok=True)
-    os.makedirs(out_vid, exist_ok=True)
+    _makedirs_once(out_aud)
+    _makedirs_once(out_vid)
     return out_aud, out_vid
 
 # _find_video_source_any_ext → imported from process_task.pyd
 
 
-def _get_ffmpeg_path() -> str:
-    """Get absolute path to ffmpeg.exe (AI Studio Fix #3)."""
-    app_root = _get_app_root()
-    # Check root first (where we copied it)
-    exe_path = os.path.join(app_root, "ffmpeg.exe")
-    if os.path.exists(exe_path):
-        return exe_path
-    # Fallback to _internal
-    exe_path = os.path.join(app_root, "_internal", "ffmpeg.exe")
-    if os.path.exists(exe_path):
-        return exe_path
-    # Last resort: assume it's in PATH
-    return "ffmpeg"
-
-
 def run_ffmpeg_fast(cmd_list: List[str]) -> None:
-    """Execute FFmpeg with stop signal support."""
+    """Execute FFmpeg with stop signal support.
+    cmd_list[0] is rewritten in place to the absolute ffmpeg path.
+    """
     if STOP_FLAG:
         raise StopRequested()
 
     # AI Studio Fix #3: Use absolute path for ffmpeg
     if cmd_list and cmd_list[0].lower() in ("ffmpeg", "ffmpeg.exe"):
-        cmd_list = list(cmd_list)  # Make copy to avoid mutating
-        cmd_list[0] = _get_ffmpeg_path()
+        cmd_list[0] = _get_ffmpeg_path()  # In place: callers build a fresh list per call
 
     if len(cmd_list) > 1:
         output_path = cmd_list[-1]
         if isinstance(output_path, str) and not output_path.startswith('-'):
             output_dir = os.path.dirname(output_path)
             if output_dir:
-                os.makedirs(output_dir, exist_ok=True)
+                _makedirs_once(output_dir)
 
     try:
         # EXE mode fix: pass cwd so subprocess finds ffmpeg in app directory
@@ -236,6 +206,30 @@ def run_ffmpeg_fast(cmd_list: List[str]) -> None:
         raise
 
 
+def _tracked_ffmpeg_impl(state, lock, total, progress_fn, cmd_list):
+    """Wraps run_ffmpeg_fast — tracks clip progress via file IPC.
+    Bound per run with functools.partial (state/lock/total/progress_fn).
+    """
+    run_ffmpeg_fast(cmd_list)
+    if cmd_list:
+        out_file = str(cmd_list[-1])
+        if out_file.endswith('.mp3'):
+            with lock:
+                state["audio_done"] += 1
+        elif out_file.endswith('.mp4'):
+            # Emit under the lock: parallel clips must not report out of order
+            with lock:
+                state["video_done"] += 1
+                n = state["video_done"]
+                pct = int(30 + (n / total) * 65)
+                # Only emit progress here; detailed log comes from _tracked_log_impl
+                progress_fn("progress", percent=min(pct, 95), message=f"Clip {n}/{total}")
+
+
+def _tracked_log_impl(progress_fn, msg):
+    """Per-clip log via file-based IPC."""
+    progress_fn("log", message=msg)
+
 
 def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fast_mode=False):
     """
@@ -247,27 +241,30 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
     """
     global STOP_FLAG, MODEL_CACHE
 
+    _progress_fh = None
     try:
         STOP_FLAG = False
+        _ai_preload = _preload_ai_modules()  # Overlaps dir/log/script setup below
+        _MKDIR_CACHE.clear()  # Output folders may have been removed since last run
         out_aud, out_vid = _ensure_out_dirs()
         
         # Initialize debug log for crash analysis
         _init_debug_log()
 
         # === File-based IPC — start EARLY so AI phase logs reach the UI ===
-        import json as _json
         import tempfile as _tempfile
         _progress_file = os.path.join(_tempfile.gettempdir(), f"aurasplit_progress_{os.getpid()}.jsonl")
+        # Large buffer: a burst of events goes out as one write when the
+        # log_writer queue goes idle (that flush is what the UI poll sees)
+        _progress_fh = open(_progress_file, "ab", buffering=1 << 16)
 
         def _file_emit(msg_type, **kwargs):
-            """Write JSON to progress file — guaranteed to work during GPU load."""
-            payload = {k: v.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ').strip()
-                       if isinstance(v, str) else v
+            """Queue JSON to progress file — written off-thread, never dropped."""
+            payload = {k: _single_line(v) if isinstance(v, str) else v
                        for k, v in kwargs.items()}
             payload["type"] = msg_type
             try:
-                with open(_progress_file, "a", encoding="utf-8") as f:
-                    f.write(_json.dumps(payload, ensure_ascii=False) + '\n')
+                log_writer.submit(_progress_fh, _encode_line(payload), block=True)
             except Exception:
                 pass
         
@@ -317,6 +314,8 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
             log_func("⏳ Loading AI dependencies (torch + whisperx)...")
             _file_emit("log", message="⏳ Loading AI dependencies (torch + whisperx)...")
             _file_emit("progress", percent=5, message="Loading AI dependencies...")
+            if _ai_preload is not None:
+                _ai_preload.join()
             import torch
             import whisperx
             log_func("✅ AI dependencies loaded!")
@@ -324,7 +323,7 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
             check_vram_available(log_func, min_gb=5)
 
             device = "cuda" if torch.cuda.is_available() else "cpu"
-            compute_type = "float16" if device == "cuda" else "int8"
+            compute_type = pick_compute_type(device)
             log_func(f"      > Device: {device.upper()}")
 
             from process_task import _dev_transcribe_pipeline
@@ -346,6 +345,7 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
                 log_func=log_func,
                 stop_check=lambda: STOP_FLAG,
                 gc_func=aggressive_gc,
+                progress_emit=_file_emit,  # Same log_writer handle — no interleaved appends
             )
 
         # ========== CUTTING (shared code) ==========
@@ -371,7 +371,12 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
             raise
 
         # === CORE ALGORITHM: Match words to script (PROTECTED in .pyd) ===
-        matches = _match_words_to_script(all_words, script_items, log_func)
+        matches = match_words_to_script_cached(
+            all_words, script_items, log_func, CONFIG["model_cache_dir"]
+        )
+
+        if not matches:
+            return log_func("⚠️ No script lines matched the audio — nothing to cut.")
 
         log_func(f"[3/3] Cutting {len(matches)} RAW clips...")
         enc_name, enc_preset = get_best_encoder(log_func)
@@ -379,24 +384,10 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
         # === Cutting state for per-clip progress ===
         _total_clips = len(matches)
         _clip_state = {"audio_done": 0, "video_done": 0}
+        _clip_lock = threading.Lock()  # Clips are cut on several threads
 
-        def _tracked_ffmpeg(cmd_list):
-            """Wraps run_ffmpeg_fast — tracks clip progress via file IPC."""
-            run_ffmpeg_fast(cmd_list)
-            if cmd_list:
-                out_file = str(cmd_list[-1])
-                if out_file.endswith('.mp3'):
-                    _clip_state["audio_done"] += 1
-                elif out_file.endswith('.mp4'):
-                    _clip_state["video_done"] += 1
-                    n = _clip_state["video_done"]
-                    pct = int(30 + (n / _total_clips) * 65)
-                    # Only emit progress here; detailed log comes from _tracked_log
-                    _file_emit("progress", percent=min(pct, 95), message=f"Clip {n}/{_total_clips}")
-
-        def _tracked_log(msg):
-            """Per-clip log via file-based IPC."""
-            _file_emit("log", message=msg)
+        _tracked_ffmpeg = partial(_tracked_ffmpeg_impl, _clip_state, _clip_lock, _total_clips, _file_emit)
+        _tracked_log = partial(_tracked_log_impl, _file_emit)
 
         log_func(f"[DEBUG] Starting cutting loop: {_total_clips} clips...")
 
@@ -414,22 +405,30 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
             log_func=_tracked_log,
             stop_check=lambda: STOP_FLAG,
             gc_func=aggressive_gc,
+            max_workers=ffmpeg_max_parallel(enc_name),
         )
 
         # Report final clip count — emitted via log_func (stdout works after loop)
         log_func(f"[DEBUG] Loop done: {_clip_state['audio_done']} audio, {_clip_state['video_done']} video clips processed")
+        if STOP_FLAG:  # Summary + debug report are for finished runs only
+            aggressive_gc()
+            return log_func("🛑 ĐÃ DỪNG.")
 
         # ── Per-clip summary: duration stats ──
-        total_duration = sum(e - s for _, s, e, _ in matches)
-        avg_duration = total_duration / len(matches) if matches else 0
-        min_dur = min((e - s for _, s, e, _ in matches), default=0)
-        max_dur = max((e - s for _, s, e, _ in matches), default=0)
+        durations = [e - s for _, s, e, _ in matches]  # One pass; builtins reduce in C
+        total_duration = sum(durations)
+        avg_duration = total_duration / len(durations) if durations else 0
+        min_dur = min(durations, default=0)
+        max_dur = max(durations, default=0)
         log_func(f"📊 CLIP SUMMARY: {_clip_state['audio_done']} clips | Total: {total_duration:.1f}s | Avg: {avg_duration:.1f}s | Min: {min_dur:.1f}s | Max: {max_dur:.1f}s")
 
         # Show first 5 and last 3 clips for quick verification
         sample_lines = []
-        show_clips = matches[:5] + ([('...', 0, 0, '...')] if len(matches) > 8 else []) + matches[-3:] if len(matches) > 8 else matches
-        for idx_m, (vid, s, e, txt) in enumerate(show_clips):
+        if len(matches) > 8:
+            show_clips = chain(matches[:5], [('...', 0, 0, '...')], matches[-3:])
+        else:
+            show_clips = matches
+        for vid, s, e, txt in show_clips:
             if vid == '...':
                 sample_lines.append("   ...")
             else:
@@ -445,15 +444,20 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
         # Write clip debug info to file for diagnostics
         try:
             debug_path = os.path.join(os.path.dirname(__file__), "cutting_debug.log")
+            # Whole report formatted up front, written in one call
+            parts = [
+                f"Total matches: {_total_clips}\n",
+                f"Audio clips processed: {_clip_state['audio_done']}\n",
+                f"Video clips processed: {_clip_state['video_done']}\n",
+                f"Total duration: {total_duration:.1f}s\n",
+                f"Avg duration: {avg_duration:.1f}s | Min: {min_dur:.1f}s | Max: {max_dur:.1f}s\n",
+            ]
+            parts.extend(
+                f"[V{str(vid).zfill(2)}] {s:.2f}→{e:.2f} ({e-s:.2f}s) {txt.replace(chr(10), ' ').replace(chr(13), '')[:50]}\n"
+                for vid, s, e, txt in matches
+            )
             with open(debug_path, "w", encoding="utf-8") as f:
-                f.write(f"Total matches: {_total_clips}\n")
-                f.write(f"Audio clips processed: {_clip_state['audio_done']}\n")
-                f.write(f"Video clips processed: {_clip_state['video_done']}\n")
-                f.write(f"Total duration: {total_duration:.1f}s\n")
-                f.write(f"Avg duration: {avg_duration:.1f}s | Min: {min_dur:.1f}s | Max: {max_dur:.1f}s\n")
-                for vid, s, e, txt in matches:
-                    txt_clean = txt.replace('\n', ' ').replace('\r', '')[:50]
-                    f.write(f"[V{str(vid).zfill(2)}] {s:.2f}→{e:.2f} ({e-s:.2f}s) {txt_clean}\n")
+                f.write("".join(parts))
         except Exception:
             pass
 
@@ -484,3 +488,5 @@ def process_workflow(lang_code, model_name, log_func: Callable[[str], None], fas
         except Exception:
             pass
         raise
+    finally:
+        _flush_and_stop(_progress_fh)
@@ -14,81 +14,39 @@ from __future__ import annotations
 import os
 import re
 import sys
-import json
 import random
-import subprocess
 import tempfile
 import datetime
 import threading
+from functools import lru_cache
 from typing import Callable, List, Tuple
 
+from engines._engine_utils import (
+    is_frozen, _get_app_root, _get_ffmpeg_path,
+    _preload_ai_modules, _MKDIR_CACHE, _makedirs_once,
+    _flush_and_stop, _single_line, _encode_line,
+    get_debug_logger,
+)
+from engines._sk3_helpers import (
+    _VIDEO_EXTS, _AUDIO_BATCH, _ffprobe_has_video_stream, _ffprobe_video_size,
+    _first_readable_index, _cut_audio_batch, _EncoderFailover, _ClipPool,
+)
 
 # DEBUG: Write all log output to file for crash analysis (matching SK1 pattern)
-DEBUG_LOG_PATH = None
-_log_lock = threading.Lock()
-
-
-def _init_debug_log():
-    """Initialize debug log file in app directory."""
-    global DEBUG_LOG_PATH
-    try:
-        if getattr(sys, 'frozen', False):
-            base_dir = os.path.dirname(os.path.abspath(sys.executable))
-        else:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-        DEBUG_LOG_PATH = os.path.join(base_dir, "sk3_debug.log")
-        with _log_lock:
-            with open(DEBUG_LOG_PATH, "w", encoding="utf-8") as f:
-                f.write(f"=== SK3 DEBUG LOG - {datetime.datetime.now()} ===\n")
-    except Exception:
-        pass
-
-
-def _debug_log(msg: str):
-    """Write to debug log file (thread-safe)."""
-    global DEBUG_LOG_PATH
-    if DEBUG_LOG_PATH:
-        try:
-            with _log_lock:
-                with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                    f.write(f"{msg}\n")
-        except Exception:
-            pass
-
-
-def is_frozen() -> bool:
-    """Check if running as compiled EXE (Nuitka/PyInstaller).
-    Uses multiple detection methods for reliability.
-    """
-    # Method 1: PyInstaller sets sys.frozen
-    if getattr(sys, 'frozen', False):
-        return True
-    # Method 2: Check if running from .exe
-    if sys.executable.lower().endswith('.exe'):
-        # Exclude python.exe from venv
-        exe_name = os.path.basename(sys.executable).lower()
-        if exe_name not in ('python.exe', 'pythonw.exe'):
-            return True
-    # Method 3: Check for _MEIPASS (PyInstaller temp folder)
-    if hasattr(sys, '_MEIPASS'):
-        return True
-    return False
-
-
-def _get_app_root() -> str:
-    """Get application root directory."""
-    if is_frozen():
-        return os.path.dirname(sys.executable)
-    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DEBUG_LOG = get_debug_logger("sk3")
+_init_debug_log = _DEBUG_LOG.init
+_debug_log = _DEBUG_LOG.log
 
 
 # Core imports
 from config.paths import _get_app_model_dir
 from core.model_manager import (
     MODEL_CACHE, KEEP_MODEL_LOADED, StopRequested,
-    aggressive_gc, check_vram_available
+    aggressive_gc, check_vram_available, pick_compute_type
 )
-from core.ffmpeg import get_best_encoder
+from core.ffmpeg import ffmpeg_max_parallel, get_best_encoder, get_hwaccel_flags
+from core import log_writer
+from core.match_cache import match_words_to_script_cached
 
 import safe_kernel
 
@@ -97,7 +55,6 @@ import safe_kernel
 # These functions call subprocess internally in .pyd → crash in EXE windowed mode
 # Now defined LOCALLY in this .py file using safe_kernel callback pattern
 from process_task import (
-    _match_words_to_script,
     _extract_words_with_fallback as _extract_words_core,
     _clean_text as clean_text,
     _parse_script as parse_script,
@@ -116,6 +73,7 @@ CONFIG = {
     "output_dir": "",
     "model_cache_dir": _get_app_model_dir(),
     "effect_type": "kenburns",
+    "fragmented_mp4": False,
 }
 
 
@@ -134,78 +92,9 @@ def set_config(config_dict: dict) -> None:
 # These were previously imported from process_task.pyd but crash in
 # PyInstaller --windowed mode due to handle inheritance issues.
 # Pattern: same fix as safe_kernel.py, core/ffmpeg.py (3-AI Consensus)
+# Probing, audio batching and the clip pool live in engines/_sk3_helpers.py
 # ==============================================================================
 
-# Windows subprocess flags to prevent CMD window flashing
-if sys.platform == "win32":
-    _SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW
-    _STARTUPINFO = subprocess.STARTUPINFO()
-    _STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-    _STARTUPINFO.wShowWindow = subprocess.SW_HIDE
-else:
-    _SUBPROCESS_FLAGS = 0
-    _STARTUPINFO = None
-
-
-def _get_ffmpeg_path() -> str:
-    """Get absolute path to ffmpeg.exe (matching SK1 pattern)."""
-    app_root = _get_app_root()
-    exe_path = os.path.join(app_root, "ffmpeg.exe")
-    if os.path.exists(exe_path):
-        return exe_path
-    exe_path = os.path.join(app_root, "_internal", "ffmpeg.exe")
-    if os.path.exists(exe_path):
-        return exe_path
-    return "ffmpeg"
-
-
-def _get_ffprobe_path() -> str:
-    """Get absolute path to ffprobe.exe."""
-    app_root = _get_app_root()
-    exe_path = os.path.join(app_root, "ffprobe.exe")
-    if os.path.exists(exe_path):
-        return exe_path
-    exe_path = os.path.join(app_root, "_internal", "ffprobe.exe")
-    if os.path.exists(exe_path):
-        return exe_path
-    return "ffprobe"
-
-
-def _ffprobe_has_video_stream(path: str) -> bool:
-    """LOCAL OVERRIDE — check if file has video stream.
-    v5.9.26: Moved from process_task.pyd to .py to avoid subprocess crash.
-    """
-    try:
-        cp = subprocess.run(
-            [
-                _get_ffprobe_path(),
-                "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=width,height",
-                "-of", "default=noprint_wrappers=1",
-                path,
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            creationflags=_SUBPROCESS_FLAGS,
-            startupinfo=_STARTUPINFO,
-        )
-        if cp.returncode != 0:
-            return False
-        w = h = 0
-        for line in (cp.stdout or "").splitlines():
-            if line.startswith("width="):
-                w = int((line.split("=", 1)[-1].strip() or "0"))
-            elif line.startswith("height="):
-                h = int((line.split("=", 1)[-1].strip() or "0"))
-        return w > 0 and h > 0
-    except Exception:
-        return False
-
-
 def _run_ffmpeg(cmd: List[str]) -> None:
     """LOCAL — run ffmpeg command with proper flags.
     v5.9.26: Uses safe_kernel.execute_safe with cwd (matching SK1 pattern).
@@ -214,15 +103,14 @@ def _run_ffmpeg(cmd: List[str]) -> None:
         raise StopRequested()
     # Use absolute ffmpeg path
     if cmd and cmd[0].lower() in ("ffmpeg", "ffmpeg.exe"):
-        cmd = list(cmd)
-        cmd[0] = _get_ffmpeg_path()
+        cmd[0] = _get_ffmpeg_path()  # In place: callers build a fresh list per call
     # Ensure output directory exists
     if len(cmd) > 1:
         output_path = cmd[-1]
         if isinstance(output_path, str) and not output_path.startswith('-'):
             output_dir = os.path.dirname(output_path)
             if output_dir:
-                os.makedirs(output_dir, exist_ok=True)
+                _makedirs_once(output_dir)
     try:
         app_root = _get_app_root()
         safe_kernel.execute_safe(cmd, cwd=app_root)
@@ -232,98 +120,121 @@ def _run_ffmpeg(cmd: List[str]) -> None:
         raise
 
 
-def _make_image_clip(
-    image_path: str,
-    out_path: str,
-    duration: float,
-    canvas_w: int,
-    canvas_h: int,
-    enc_name: str,
-    enc_preset: str,
-    effect_type: str = "kenburns",
-) -> None:
-    """LOCAL OVERRIDE — create video clip from image with Ken Burns effect.
-    v5.9.26: Moved from process_task.pyd to avoid subprocess crash.
-    Uses safe_kernel.execute_safe instead of internal _run().
-    """
-    fps = 30
-    dur = max(0.10, float(duration))
-    frames = max(1, int(dur * fps))
+# UI effect names → internal effect names
+_EFFECT_MAP = {
+    "kenburns (zoom)": "zoom_in", "kenburns": "zoom_in",
+    "zoom_in": "zoom_in", "zoom in": "zoom_in",
+    "zoom in (center)": "zoom_in", "zoom out (center)": "zoom_out",
+    "pan left → right": "pan_left", "pan right → left": "pan_right",
+    "zoom in + pan": "zoom_pan", "random": "random",
+    "không hiệu ứng": "none", "none": "none", "static": "none",
+}
 
-    # Detect if input is video or image
-    video_exts = {'.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v'}
-    ext = os.path.splitext(image_path)[1].lower()
-    is_video = ext in video_exts
 
-    # Map UI names to internal effect names
-    effect_lower = (effect_type or "").strip().lower()
-    effect_map = {
-        "kenburns (zoom)": "zoom_in", "kenburns": "zoom_in",
-        "zoom_in": "zoom_in", "zoom in": "zoom_in",
-        "zoom in (center)": "zoom_in", "zoom out (center)": "zoom_out",
-        "pan left → right": "pan_left", "pan right → left": "pan_right",
-        "zoom in + pan": "zoom_pan", "random": "random",
-        "không hiệu ứng": "none", "none": "none", "static": "none",
-    }
-    internal_effect = effect_map.get(effect_lower, effect_lower)
+# +faststart rewrites the finished file to move the moov atom to the front;
+# fragmented output is final as written (no second pass) but some editors
+# import fragmented MP4 poorly — opt-in via CONFIG["fragmented_mp4"].
+_MOVFLAGS_FASTSTART = "+faststart"
+_MOVFLAGS_FRAGMENTED = "+empty_moov+frag_keyframe+default_base_moof"
 
-    if internal_effect == "random":
-        internal_effect = random.choice(["zoom_in", "zoom_out"])
 
+@lru_cache(maxsize=256)
+def _build_vf(internal_effect: str, canvas_w: int, canvas_h: int, frames: int, fps: int) -> str:
+    """VF filter for an effect — memoized, clips mostly share canvas + frame count."""
     scaled_w = int(canvas_w * 1.15)
     scaled_h = int(canvas_h * 1.15)
 
-    # Build VF filter based on effect type
     if internal_effect in ("none", "static"):
-        vf = (
+        return (
             "scale={w}:{h}:force_original_aspect_ratio=increase,"
-            "crop={w}:{h},format=yuv420p"
+            "crop={w}:{h}"
         ).format(w=canvas_w, h=canvas_h)
     elif internal_effect == "zoom_out":
-        vf = (
+        return (
             "scale={sw}:{sh}:force_original_aspect_ratio=increase:flags=lanczos,"
             "crop={sw}:{sh},"
             "zoompan=z='1.15-0.10*sin(on/{frames}*PI/2)':"
-            "x='0':y='0':d={frames}:s={w}x{h}:fps={fps},format=yuv420p"
+            "x='0':y='0':d={frames}:s={w}x{h}:fps={fps}"
         ).format(sw=scaled_w, sh=scaled_h, w=canvas_w, h=canvas_h, frames=frames, fps=fps)
     elif internal_effect == "pan_left":
-        vf = (
+        return (
             "scale={sw}:{sh}:force_original_aspect_ratio=increase:flags=lanczos,"
             "crop={sw}:{sh},"
             "zoompan=z='1.0':x='(iw-ow)*on/{frames}':y='0':"
-            "d={frames}:s={w}x{h}:fps={fps},format=yuv420p"
+            "d={frames}:s={w}x{h}:fps={fps}"
         ).format(sw=scaled_w, sh=scaled_h, w=canvas_w, h=canvas_h, frames=frames, fps=fps)
     elif internal_effect == "pan_right":
-        vf = (
+        return (
             "scale={sw}:{sh}:force_original_aspect_ratio=increase:flags=lanczos,"
             "crop={sw}:{sh},"
             "zoompan=z='1.0':x='(iw-ow)*(1-on/{frames})':y='0':"
-            "d={frames}:s={w}x{h}:fps={fps},format=yuv420p"
+            "d={frames}:s={w}x{h}:fps={fps}"
         ).format(sw=scaled_w, sh=scaled_h, w=canvas_w, h=canvas_h, frames=frames, fps=fps)
     else:
         # Default: zoom_in — smooth Ken Burns
-        vf = (
+        return (
             "scale={sw}:{sh}:force_original_aspect_ratio=increase:flags=lanczos,"
             "crop={sw}:{sh},"
             "zoompan=z='1.0+0.10*sin(on/{frames}*PI/2)':"
-            "x='0':y='0':d={frames}:s={w}x{h}:fps={fps},format=yuv420p"
+            "x='0':y='0':d={frames}:s={w}x{h}:fps={fps}"
         ).format(sw=scaled_w, sh=scaled_h, w=canvas_w, h=canvas_h, frames=frames, fps=fps)
 
+
+def _make_image_clip(
+    image_path: str,
+    out_path: str,
+    duration: float,
+    canvas_w: int,
+    canvas_h: int,
+    enc_name: str,
+    enc_preset: str,
+    effect_type: str = "kenburns",
+    fragmented: bool = False,
+) -> None:
+    """LOCAL OVERRIDE — create video clip from image with Ken Burns effect.
+    v5.9.26: Moved from process_task.pyd to avoid subprocess crash.
+    Uses safe_kernel.execute_safe instead of internal _run().
+    """
+    fps = 30
+    dur = max(0.10, float(duration))
+    frames = max(1, int(dur * fps))
+
+    # Detect if input is video or image
+    ext = os.path.splitext(image_path)[1].lower()
+    is_video = ext in _VIDEO_EXTS
+
+    # Map UI names to internal effect names
+    effect_lower = (effect_type or "").strip().lower()
+    internal_effect = _EFFECT_MAP.get(effect_lower, effect_lower)
+
+    if internal_effect == "random":
+        internal_effect = random.choice(["zoom_in", "zoom_out"])
+
+    vf = _build_vf(internal_effect, canvas_w, canvas_h, frames, fps)
+    # The output -pix_fmt is the graph's only format conversion (no separate
+    # format= filter); NV12 is NVENC's native input layout.
+    pix_fmt = "nv12" if "nvenc" in enc_name else "yuv420p"
+    movflags = _MOVFLAGS_FRAGMENTED if fragmented else _MOVFLAGS_FASTSTART
+
     if is_video:
+        # NVENC run: decode the source on the GPU too. Frames come back to
+        # system memory for the CPU filters (zoompan has no CUDA version);
+        # the libx264 retry stays fully software.
+        hwaccel = get_hwaccel_flags() if "nvenc" in enc_name else []
         cmd = [
-            "ffmpeg", "-y", "-i", image_path, "-t", str(dur),
+            "ffmpeg", "-y", *hwaccel, "-i", image_path, "-t", str(dur),
             "-vf", vf, "-an", "-r", str(fps),
             "-c:v", enc_name, "-preset", enc_preset,
-            "-pix_fmt", "yuv420p", "-map_metadata", "-1",
-            "-movflags", "+faststart", "-loglevel", "error", out_path,
+            "-pix_fmt", pix_fmt, "-map_metadata", "-1",
+            "-movflags", movflags, "-loglevel", "error", out_path,
         ]
     else:
         cmd = [
             "ffmpeg", "-y", "-loop", "1", "-i", image_path,
             "-frames:v", str(frames), "-vf", vf, "-an", "-r", str(fps),
             "-c:v", enc_name, "-preset", enc_preset,
-            "-pix_fmt", "yuv420p", "-map_metadata", "-1",
-            "-movflags", "+faststart", "-loglevel", "error", out_path,
+            "-pix_fmt", pix_fmt, "-map_metadata", "-1",
+            "-movflags", movflags, "-loglevel", "error", out_path,
         ]
 
     _run_ffmpeg(cmd)
@@ -345,6 +256,8 @@ def _image_flow_loop(
     log_func,                # callback: log_func(msg)
     stop_check,              # callback: lambda: STOP_FLAG
     gc_func=None,            # callback: aggressive_gc()
+    max_workers=1,           # >1: encode clips concurrently (log_func must be thread-safe)
+    fragmented_mp4=False,    # True: fragmented MP4 clips (no faststart rewrite)
 ):
     """LOCAL OVERRIDE — Image flow cutting loop.
     v5.9.26: Moved from process_task.pyd to avoid subprocess crash.
@@ -352,7 +265,25 @@ def _image_flow_loop(
     """
     total = len(matches)
     cursor = start_idx
-    processed = 0
+    audio_errors = {}  # vid -> exception, for the current audio batch
+    encoder = _EncoderFailover(enc_name, enc_preset, log_func)
+
+    def _video_clip(idx, vid, picked, duration, text):
+        v_out = os.path.join(out_vid, f"{str(vid).zfill(3)}.mp4")
+        encoder.run(lambda enc, preset: _make_image_clip(  # LOCAL .py version — uses safe_kernel!
+            picked, v_out, duration, canvas_w, canvas_h,
+            enc, preset, effect_type, fragmented_mp4
+        ))
+
+        text_display = text[:40] + "..." if len(text) > 40 else text
+        log_func(
+            f"[{str(idx).zfill(2)}/{total}] [V{str(vid).zfill(2)}] "
+            f"✓ Audio + 🖼️ Image | {duration:.2f}s | Text: {text_display}"
+        )
+
+    # Audio cuts + round-robin picking stay on this thread (ordered, cheap);
+    # only the Ken Burns encodes run on the pool
+    clips = _ClipPool(max_workers)
 
     for idx, (vid, s_time, e_time, text) in enumerate(matches, 1):
         if stop_check():
@@ -365,20 +296,14 @@ def _image_flow_loop(
 
         duration = max(0.10, e_time - s_time)
 
-        # ── Cut Audio ──
-        a_out = os.path.join(out_aud, f"{str(vid).zfill(3)}.mp3")
-        try:
-            ffmpeg_runner([
-                "ffmpeg", "-y",
-                "-ss", str(s_time),
-                "-to", str(e_time),
-                "-i", audio_path,
-                "-vn", "-acodec", "libmp3lame",
-                "-q:a", "2",
-                "-loglevel", "error",
-                a_out,
-            ])
-        except Exception as audio_err:
+        # ── Cut Audio (batched: one FFmpeg per _AUDIO_BATCH clips) ──
+        if (idx - 1) % _AUDIO_BATCH == 0:
+            audio_errors = _cut_audio_batch(
+                matches[idx - 1:idx - 1 + _AUDIO_BATCH], audio_path, out_aud,
+                ffmpeg_runner, stop_check,
+            )
+        audio_err = audio_errors.get(vid)
+        if audio_err is not None:
             log_func(f"❌ [V{str(vid).zfill(2)}] Audio cut FAILED: {audio_err}")
             continue
 
@@ -397,28 +322,10 @@ def _image_flow_loop(
             continue
 
         # ── Create video clip with Ken Burns effect ──
-        v_out = os.path.join(out_vid, f"{str(vid).zfill(3)}.mp4")
-        try:
-            _make_image_clip(  # LOCAL .py version — uses safe_kernel!
-                picked, v_out, duration, canvas_w, canvas_h,
-                enc_name, enc_preset, effect_type
-            )
-        except Exception:
-            # Fallback: use software encoder
-            _make_image_clip(
-                picked, v_out, duration, canvas_w, canvas_h,
-                "libx264", "ultrafast", effect_type
-            )
-
-        text_display = text[:40] + "..." if len(text) > 40 else text
-        log_func(
-            f"[{str(idx).zfill(2)}/{total}] [V{str(vid).zfill(2)}] "
-            f"✓ Audio + 🖼️ Image | {duration:.2f}s | Text: {text_display}"
-        )
-
-        processed += 1
+        if not clips.submit(_video_clip, idx, vid, picked, duration, text):
+            break
 
-    return processed
+    return clips.close()
 
 
 # All AI logic → process_task.pyd (_get_display_name, _dev_transcribe_pipeline, etc.)
@@ -463,8 +370,8 @@ def _ensure_out_dirs() -> Tuple[str, str]:
     """Create output directories. Uses CONFIG global — stays in wrapper."""
     out_aud = os.path.join(CONFIG["output_dir"], "audios")
     out_vid = os.path.join(CONFIG["output_dir"], "videos")
-    os.makedirs(out_aud, exist_ok=True)
-    os.makedirs(out_vid, exist_ok=True)
+    _makedirs_once(out_aud)
+    _makedirs_once(out_vid)
     return out_aud, out_vid
 
 # _list_visual_files_recursive → imported from process_task.pyd (pure Python, no subprocess — safe)
@@ -473,21 +380,21 @@ def _ensure_out_dirs() -> Tuple[str, str]:
 def run_ffmpeg_fast(cmd_list: List[str]) -> None:
     """Execute FFmpeg with stop signal support.
     v5.9.26 FIX: Added cwd=app_root (matching SK1 pattern).
+    cmd_list[0] is rewritten in place to the absolute ffmpeg path.
     """
     if STOP_FLAG:
         raise StopRequested()
 
     # Use absolute path for ffmpeg (matching SK1)
     if cmd_list and cmd_list[0].lower() in ("ffmpeg", "ffmpeg.exe"):
-        cmd_list = list(cmd_list)
-        cmd_list[0] = _get_ffmpeg_path()
+        cmd_list[0] = _get_ffmpeg_path()  # In place: callers build a fresh list per call
 
     if len(cmd_list) > 1:
         output_path = cmd_list[-1]
         if isinstance(output_path, str) and not output_path.startswith('-'):
             output_dir = os.path.dirname(output_path)
             if output_dir:
-                os.makedirs(output_dir, exist_ok=True)
+                _makedirs_once(output_dir)
     try:
         app_root = _get_app_root()
         safe_kernel.execute_safe(cmd_list, cwd=app_root)  # v5.9.26: Added cwd!
@@ -522,12 +429,17 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
     import faulthandler as _fh
     _crash_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
     _crash_file = os.path.join(_crash_dir, "SK3_CRASH_DETAIL.txt")
+    try:
+        # One handle per run; line-buffered so each marker reaches the OS
+        # before the next step runs (survives a segfault, no reopen per marker)
+        _cm_fh = open(_crash_file, "a", encoding="utf-8", buffering=1)
+    except Exception:
+        _cm_fh = None
     def _cm(step):
+        if _cm_fh is None:
+            return
         try:
-            with open(_crash_file, "a", encoding="utf-8") as _f:
-                import datetime as _dt
-                _f.write(f"[{_dt.datetime.now()}] {step}\n")
-                _f.flush()
+            _cm_fh.write(f"[{datetime.datetime.now()}] {step}\n")
         except Exception:
             pass
     _cm("SK3-A: Entered process_image_flow")
@@ -540,9 +452,12 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
     except Exception:
         _cm("SK3-B: faulthandler FAILED (non-fatal)")
 
+    _progress_fh = None
     try:
         _cm("SK3-C: Before STOP_FLAG=False")
         STOP_FLAG = False
+        _ai_preload = _preload_ai_modules()  # Overlaps dir/log/script setup below
+        _MKDIR_CACHE.clear()  # Output folders may have been removed since last run
         _cm("SK3-D: Before _ensure_out_dirs")
         out_aud, out_vid = _ensure_out_dirs()
         _cm(f"SK3-E: out_dirs OK: {out_aud}")
@@ -552,19 +467,19 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
         _cm("SK3-F: debug log initialized")
 
         # === File-based IPC — start EARLY so AI phase logs reach the UI ===
-        import json as _json
         import tempfile as _tempfile
         _progress_file = os.path.join(_tempfile.gettempdir(), f"aurasplit_progress_{os.getpid()}.jsonl")
+        # Large buffer: a burst of events goes out as one write when the
+        # log_writer queue goes idle (that flush is what the UI poll sees)
+        _progress_fh = open(_progress_file, "ab", buffering=1 << 16)
 
         def _file_emit(msg_type, **kwargs):
-            """Write JSON to progress file — guaranteed to work during GPU load."""
-            payload = {k: v.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ').strip()
-                       if isinstance(v, str) else v
+            """Queue JSON to progress file — written off-thread, never dropped."""
+            payload = {k: _single_line(v) if isinstance(v, str) else v
                        for k, v in kwargs.items()}
             payload["type"] = msg_type
             try:
-                with open(_progress_file, "a", encoding="utf-8") as f:
-                    f.write(_json.dumps(payload, ensure_ascii=False) + '\n')
+                log_writer.submit(_progress_fh, _encode_line(payload), block=True)
             except Exception:
                 pass
 
@@ -582,30 +497,17 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
 
         # v5.9.26: Use LOCAL _ffprobe_has_video_stream (not from .pyd!)
         _cm("SK3-I: Before ffprobe loop")
-        start_idx = None
-        for i, p in enumerate(files):
-            _cm(f"SK3-I-{i}: ffprobe checking: {os.path.basename(p)}")
-            if _ffprobe_has_video_stream(p):
-                start_idx = i
-                _cm(f"SK3-I-{i}: FOUND valid file at index {i}")
-                break
+        start_idx = _first_readable_index(files, mark=_cm)
         if start_idx is None:
             raise RuntimeError("Không có file ảnh/video nào ffprobe đọc được.")
+        _cm(f"SK3-I-{start_idx}: FOUND valid file at index {start_idx}: {os.path.basename(files[start_idx])}")
 
         _cm("SK3-J: Before aspect ratio detection")
         # Auto-detect aspect ratio
         first_file = files[start_idx]
         try:
-            probe_cmd = [
-                _get_ffprobe_path(), "-v", "error", "-select_streams", "v:0",
-                "-show_entries", "stream=width,height", "-of", "csv=p=0:s=x",
-                first_file
-            ]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=10,
-                                          creationflags=_SUBPROCESS_FLAGS, startupinfo=_STARTUPINFO)
-            if probe_result.returncode == 0 and probe_result.stdout.strip():
-                dims = probe_result.stdout.strip().split("x")
-                input_w, input_h = int(dims[0]), int(dims[1])
+            input_w, input_h = _ffprobe_video_size(first_file, timeout=10)
+            if input_w > 0 and input_h > 0:
                 if input_w > input_h:
                     canvas_w, canvas_h = 1920, 1080
                     log_func(f"📐 Detected: {input_w}x{input_h} → Output: 16:9 (1920x1080)")
@@ -658,13 +560,15 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
         else:
             # DEV MODE: Direct import → callbacks to .pyd pipeline
             log_func("[DEV MODE] Using direct whisperx import...")
+            if _ai_preload is not None:
+                _ai_preload.join()
             import torch
             import whisperx
 
             check_vram_available(log_func, min_gb=5)
 
             device = "cuda" if torch.cuda.is_available() else "cpu"
-            compute_type = "float16" if device == "cuda" else "int8"
+            compute_type = pick_compute_type(device)
             log_func(f"      > Device: {device.upper()}")
 
             from process_task import _dev_transcribe_pipeline
@@ -686,6 +590,7 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
                 log_func=log_func,
                 stop_check=lambda: STOP_FLAG,
                 gc_func=aggressive_gc,
+                progress_emit=_file_emit,  # Same log_writer handle — no interleaved appends
             )
 
         # ========== IMAGE FLOW CUTTING (shared code) ==========
@@ -711,7 +616,9 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
         enc_name, enc_preset = get_best_encoder(log_func)
 
         # === CORE ALGORITHM: Match words to script (PROTECTED in .pyd) ===
-        matches = _match_words_to_script(all_words, script_items, log_func)
+        matches = match_words_to_script_cached(
+            all_words, script_items, log_func, CONFIG["model_cache_dir"]
+        )
 
         log_func(f"[3/3] Cutting {len(matches)} IMAGE clips...")
 
@@ -719,16 +626,18 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
         _total_clips = len(matches)
 
         _clip_counter = {"done": 0}
+        _clip_lock = threading.Lock()  # Clips finish on several threads
 
         def _tracked_log_sk3(msg):
             """Per-clip log via file-based IPC."""
             _file_emit("log", message=msg)
             # Also emit progress for per-clip messages
             if msg and "[V" in msg and "✓" in msg:
-                _clip_counter["done"] += 1
-                n = _clip_counter["done"]
-                pct = int(30 + (n / _total_clips) * 65)
-                _file_emit("progress", percent=min(pct, 95), message=f"Clip {n}/{_total_clips}")
+                with _clip_lock:  # Emit under the lock: keeps "Clip n/N" in order
+                    _clip_counter["done"] += 1
+                    n = _clip_counter["done"]
+                    pct = int(30 + (n / _total_clips) * 65)
+                    _file_emit("progress", percent=min(pct, 95), message=f"Clip {n}/{_total_clips}")
 
         # === IMAGE FLOW LOOP (LOCAL .py version — v5.9.26 FIX) ===
         _image_flow_loop(
@@ -747,6 +656,8 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
             log_func=_tracked_log_sk3,
             stop_check=lambda: STOP_FLAG,
             gc_func=aggressive_gc,
+            max_workers=ffmpeg_max_parallel(enc_name),
+            fragmented_mp4=bool(CONFIG.get("fragmented_mp4", False)),
         )
 
         aggressive_gc()
@@ -776,3 +687,10 @@ def process_image_flow(lang_code, model_name, log_func: Callable[[str], None], f
         except Exception:
             pass
         raise
+    finally:
+        _flush_and_stop(_progress_fh)
+        if _cm_fh is not None:
+            try:
+                _cm_fh.close()
+            except Exception:
+                pass
@@ -13,11 +13,13 @@ Engines:
 """
 
 import os
+import re
 import sys
 import json
 import subprocess
 import tempfile
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, Callable, List, Dict, Any
 
@@ -26,6 +28,16 @@ import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
+# ── CUDA caching allocator (read once, when torch first initializes CUDA) ──
+# Long sessions run many video → SRT passes; splitting cap + early GC of
+# cached blocks keep fragmentation and reserved memory down. Expandable
+# segments are not supported by the Windows allocator.
+os.environ.setdefault(
+    "PYTORCH_CUDA_ALLOC_CONF",
+    "max_split_size_mb:256,garbage_collection_threshold:0.8"
+    + ("" if sys.platform == "win32" else ",expandable_segments:True"),
+)
+
 # ── Constants ──
 SUPPORTED_LANGUAGES = {
     "auto": None,
@@ -50,18 +62,27 @@ ALIGNER_MODEL = "Qwen/Qwen3-ForcedAligner-0.6B"
 
 # faster-whisper model
 FASTER_WHISPER_MODEL = "large-v3-turbo"
+# CTranslate2 compute type — "auto" picks the fastest type the device supports
+# (e.g. int8_float16 on recent GPUs, int8 on CPU). Env var forces a specific one.
+WHISPER_COMPUTE_TYPE = os.environ.get("WHISPERX_COMPUTE_TYPE", "auto")
+# Qwen3-ASR on CPU: dynamic int8 on Linear layers (opt-in, AURA_CPU_INT8=1)
+QWEN_CPU_INT8 = os.environ.get("AURA_CPU_INT8", "") == "1"
 
 # Max audio chunk duration for ForcedAligner (seconds)
 ALIGNER_MAX_DURATION = 300  # 5 minutes
 
 # ── Model Cache (skip reload on repeated calls) ──
 _model_cache: Dict[str, Any] = {}
+# wav2vec2 align models per (language, device), least recently used first
+_align_cache: "OrderedDict[str, tuple]" = OrderedDict()
+MAX_CACHED_ALIGN_MODELS = 2  # Most users alternate between two languages
 
 
 def clear_sub_cache():
     """Free all cached models and GPU memory."""
     global _model_cache
     _model_cache.clear()
+    _align_cache.clear()
     try:
         import torch
         if torch.cuda.is_available():
@@ -70,6 +91,66 @@ def clear_sub_cache():
         pass
 
 
+def _release_cached_vram(torch) -> None:
+    """Per-file path: empty_cache() is slow, so only call it when over 2 GB
+    sits reserved but unused. clear_sub_cache() always empties."""
+    if torch.cuda.memory_reserved() - torch.cuda.memory_allocated() > 2 * 1024 ** 3:
+        torch.cuda.empty_cache()
+
+
+def _whisper_batch_size(torch, device: str) -> int:
+    """WhisperX batch size on GPU: 16, scaled up to 32 with free VRAM
+    (~512 MB per batch slot). Call after the model is loaded so its weights
+    are already counted; an OOM during transcribe halves it from there."""
+    if device != "cuda":
+        return 4
+    try:
+        free_bytes, _ = torch.cuda.mem_get_info()
+    except Exception:
+        return 16
+    return max(16, min(32, free_bytes // (512 * 1024 ** 2)))
+
+
+def _get_align_model(whisperx, lang: str, device: str) -> tuple:
+    """(align_model, metadata) for lang, cached — reloading wav2vec2 every
+    call cost seconds. Keeps MAX_CACHED_ALIGN_MODELS; the least recently
+    used one is evicted (CUDA cache released if enough sits unused)."""
+    key = f"wx_align:{lang}:{device}"
+    entry = _align_cache.get(key)
+    if entry is not None:
+        _align_cache.move_to_end(key)
+        return entry
+
+    entry = whisperx.load_align_model(language_code=lang, device=device)
+    _align_cache[key] = entry
+    if len(_align_cache) > MAX_CACHED_ALIGN_MODELS:
+        _, (old_model, _) = _align_cache.popitem(last=False)
+        try:
+            old_model.to("cpu")
+        except Exception:
+            pass
+        del old_model
+        if device == "cuda":
+            import torch
+            _release_cached_vram(torch)
+    return entry
+
+
+def _quantize_linear_int8(model) -> bool:
+    """Dynamic int8 quantization of the Linear layers, in place (CPU only).
+    Conv layers (audio frontend) stay fp32. The forced aligner is a separate
+    model and is left as-is. Returns False if no nn.Module was found.
+    """
+    import torch
+    target = model if isinstance(model, torch.nn.Module) else getattr(model, "model", None)
+    if not isinstance(target, torch.nn.Module):
+        return False
+    torch.ao.quantization.quantize_dynamic(
+        target, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+    return True
+
+
 def get_engine_for_lang(lang: str) -> str:
     """Determine which engine to use based on language.
     Returns 'qwen' or 'whisper'.
@@ -82,34 +163,44 @@ def get_engine_for_lang(lang: str) -> str:
 
 def _format_timestamp(seconds: float) -> str:
     """Convert seconds to SRT timestamp format: HH:MM:SS,mmm"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+    # One integer ms value + divmod chain (no float % per field)
+    secs, millis = divmod(int(seconds * 1000), 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+    return "%02d:%02d:%02d,%03d" % (hours, minutes, secs, millis)
 
 
-def _extract_audio(video_path: str, output_path: str, log_func: Callable) -> bool:
-    """Extract audio from video file using FFmpeg."""
-    log_func(f"🎵 Extracting audio from video...")
-
-    # Find FFmpeg: check binaries/ dir first, then system PATH
+def _find_ffmpeg() -> str:
+    """FFmpeg path: check binaries/ dir first, then system PATH."""
     _engines_dir = os.path.dirname(os.path.abspath(__file__))
     _root_dir = os.path.dirname(os.path.dirname(_engines_dir))  # AuraSplit_v2/..
     ffmpeg_candidates = [
         os.path.join(os.path.dirname(_engines_dir), "..", "binaries", "ffmpeg.exe"),
         os.path.join(_root_dir, "binaries", "ffmpeg.exe"),
         os.path.join(_root_dir, "ffmpeg.exe"),
-        "ffmpeg",  # fallback to system PATH
     ]
-    ffmpeg_path = "ffmpeg"
     for candidate in ffmpeg_candidates:
         if os.path.isfile(candidate):
-            ffmpeg_path = os.path.abspath(candidate)
-            break
+            return os.path.abspath(candidate)
+    return "ffmpeg"  # fallback to system PATH
+
+
+def _hidden_startupinfo():
+    """Hide ffmpeg window on Windows."""
+    if sys.platform != "win32":
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return startupinfo
+
+
+def _extract_audio(video_path: str, output_path: str, log_func: Callable) -> bool:
+    """Extract audio from video file using FFmpeg."""
+    log_func(f"🎵 Extracting audio from video...")
 
     cmd = [
-        ffmpeg_path, "-y",
+        _find_ffmpeg(), "-y",
         "-i", video_path,
         "-vn",                    # no video
         "-acodec", "pcm_s16le",   # 16-bit PCM WAV
@@ -118,16 +209,9 @@ def _extract_audio(video_path: str, output_path: str, log_func: Callable) -> boo
         output_path,
     ]
     try:
-        # Hide ffmpeg window on Windows
-        startupinfo = None
-        if sys.platform == "win32":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-
         result = subprocess.run(
             cmd, capture_output=True, text=True,
-            startupinfo=startupinfo, timeout=120,
+            startupinfo=_hidden_startupinfo(), timeout=120,
         )
         if result.returncode != 0:
             log_func(f"⚠️ FFmpeg error: {result.stderr[:200]}")
@@ -139,19 +223,68 @@ def _extract_audio(video_path: str, output_path: str, log_func: Callable) -> boo
         return False
 
 
+def _extract_audio_array(video_path: str, log_func: Callable):
+    """Decode the audio track straight into memory as 16 kHz mono float32
+    (what whisperx.load_audio returns) — no temp WAV written and re-read.
+    Returns None on failure.
+    """
+    import numpy as np
+
+    cmd = [
+        _find_ffmpeg(), "-nostdin",
+        "-i", video_path,
+        "-vn",
+        "-f", "s16le", "-acodec", "pcm_s16le",
+        "-ar", "16000",
+        "-ac", "1",
+        "-loglevel", "error",
+        "pipe:1",
+    ]
+    try:
+        result = subprocess.run(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            startupinfo=_hidden_startupinfo(), timeout=120,
+        )
+    except Exception as e:
+        log_func(f"❌ Audio extraction failed: {e}")
+        return None
+    if result.returncode != 0 or not result.stdout:
+        log_func(f"⚠️ FFmpeg error: {result.stderr.decode('utf-8', 'replace')[:200]}")
+        return None
+    audio = np.frombuffer(result.stdout, np.int16).astype(np.float32)
+    audio *= 1.0 / 32768.0
+    log_func(f"✅ Audio decoded: {len(audio) / 16000:.1f}s")
+    return audio
+
+
 def _segments_to_srt(segments: List[Dict[str, Any]]) -> str:
     """Convert transcript segments to SRT format string."""
-    srt_lines = []
-    for i, seg in enumerate(segments, 1):
-        start = _format_timestamp(seg["start"])
-        end = _format_timestamp(seg["end"])
-        text = seg["text"].strip()
-        if text:
-            srt_lines.append(f"{i}")
-            srt_lines.append(f"{start} --> {end}")
-            srt_lines.append(text)
-            srt_lines.append("")
-    return "\n".join(srt_lines)
+    ts = _format_timestamp
+    # One "index\nstart --> end\ntext\n" block per non-empty segment
+    blocks = [
+        "%d\n%s --> %s\n%s\n" % (i, ts(seg["start"]), ts(seg["end"]), text)
+        for i, seg in enumerate(segments, 1)
+        if (text := seg["text"].strip())
+    ]
+    return "\n".join(blocks)
+
+
+_SENTENCE_ENDERS = frozenset('.!?。！？…')
+# CJK ideographs, kana, Hangul — segments containing any are joined without spaces
+_CJK_RE = re.compile('[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]')
+
+
+def _join_segment_words(words: List[str]) -> str:
+    text = "".join(words)
+    return text if _CJK_RE.search(text) else " ".join(words)
+
+
+def _first_attr(obj, names: tuple) -> Optional[str]:
+    """First of `names` that obj has as an attribute, else None."""
+    for name in names:
+        if hasattr(obj, name):
+            return name
+    return None
 
 
 def _word_timestamps_to_segments(
@@ -174,7 +307,7 @@ def _word_timestamps_to_segments(
     current_words = []
     current_start = None
 
-    sentence_enders = {'.', '!', '?', '。', '！', '？', '…'}
+    attr_names: Dict[type, tuple] = {}  # item type -> (text, start, end) attr names
 
     for ts in time_stamps:
         # Handle both dict and ForcedAlignItem (dataclass) formats
@@ -183,12 +316,21 @@ def _word_timestamps_to_segments(
             start = ts.get("start", ts.get("s", 0))
             end = ts.get("end", ts.get("e", 0))
         else:
-            # ForcedAlignItem dataclass: .text, .start_time, .end_time
-            word = getattr(ts, "text", getattr(ts, "word", ""))
+            # ForcedAlignItem dataclass: .text, .start_time, .end_time —
+            # attribute names resolved once per item type, not per word
+            names = attr_names.get(type(ts))
+            if names is None:
+                names = attr_names[type(ts)] = (
+                    _first_attr(ts, ("text", "word")),
+                    _first_attr(ts, ("start_time", "start", "s")),
+                    _first_attr(ts, ("end_time", "end", "e")),
+                )
+            text_attr, start_attr, end_attr = names
+            word = getattr(ts, text_attr) if text_attr else ""
             if word:
                 word = word.strip()
-            start = getattr(ts, "start_time", getattr(ts, "start", getattr(ts, "s", 0)))
-            end = getattr(ts, "end_time", getattr(ts, "end", getattr(ts, "e", 0)))
+            start = getattr(ts, start_attr) if start_attr else 0
+            end = getattr(ts, end_attr) if end_attr else 0
 
         if not word:
             continue
@@ -200,35 +342,25 @@ def _word_timestamps_to_segments(
         current_end = end
 
         # Check if we should break into a new segment
-        is_sentence_end = any(word.endswith(c) for c in sentence_enders)
+        is_sentence_end = word[-1] in _SENTENCE_ENDERS
         too_many_words = len(current_words) >= max_words_per_segment
         too_long = (current_end - current_start) >= max_duration_per_segment
 
         if is_sentence_end or too_many_words or too_long:
-            text = " ".join(current_words)
-            # For CJK: join without spaces
-            if any('\u4e00' <= c <= '\u9fff' or '\u3040' <= c <= '\u30ff'
-                   or '\uac00' <= c <= '\ud7af' for c in text):
-                text = "".join(current_words)
-
             segments.append({
                 "start": current_start,
                 "end": current_end,
-                "text": text,
+                "text": _join_segment_words(current_words),  # CJK: no spaces
             })
             current_words = []
             current_start = None
 
     # Flush remaining words
     if current_words and current_start is not None:
-        text = " ".join(current_words)
-        if any('\u4e00' <= c <= '\u9fff' or '\u3040' <= c <= '\u30ff'
-               or '\uac00' <= c <= '\ud7af' for c in text):
-            text = "".join(current_words)
         segments.append({
             "start": current_start,
             "end": current_end,
-            "text": text,
+            "text": _join_segment_words(current_words),
         })
 
     return segments
@@ -261,126 +393,125 @@ def transcribe_with_whisperx(
 
     # ── Step 1: Extract audio ──
     log_func("[1/4] 🎵 Extracting audio from video...")
-    audio_path = os.path.join(
-        tempfile.gettempdir(),
-        f"aurasplit_wx_{int(time.time())}.wav"
-    )
-    if not _extract_audio(video_path, audio_path, log_func):
+    audio = _extract_audio_array(video_path, log_func)
+    if audio is None:
         raise RuntimeError(f"Failed to extract audio from {video_path}")
 
-    try:
-        import torch
-        import whisperx
-
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        compute_type = "float16" if device == "cuda" else "int8"
-        batch_size = 16 if device == "cuda" else 4
+    import torch
+    import whisperx
 
-        log_func(f"   Device: {device}, Model: {model_size}, Compute: {compute_type}, Batch: {batch_size}")
-
-        # ── Step 2: Load WhisperX model (cached) ──
-        cache_key = f"whisperx:{model_size}:{device}:{compute_type}"
-        if cache_key in _model_cache:
-            model = _model_cache[cache_key]
-            log_func("[2/4] ⚡ WhisperX model loaded from cache!")
-        else:
-            log_func("[2/4] 🧠 Loading WhisperX model (first time)...")
-            model_kwargs = dict(
-                whisper_arch=model_size,
-                device=device,
-                compute_type=compute_type,
-            )
-            if model_cache_dir:
-                model_kwargs["download_root"] = model_cache_dir
-
-            model = whisperx.load_model(**model_kwargs)
-            _model_cache[cache_key] = model
-            log_func("✅ Model loaded & cached!")
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    compute_type = WHISPER_COMPUTE_TYPE
 
-        # ── Step 3: Transcribe (batched — 2-3x faster) ──
-        log_func("[3/4] 🎤 Transcribing audio (batched)...")
-        audio = whisperx.load_audio(audio_path)
+    log_func(f"   Device: {device}, Model: {model_size}, Compute: {compute_type}")
 
-        transcribe_kwargs = dict(
-            audio=audio,
-            batch_size=batch_size,
+    # ── Step 2: Load WhisperX model (cached) ──
+    cache_key = f"whisperx:{model_size}:{device}:{compute_type}"
+    if cache_key in _model_cache:
+        model = _model_cache[cache_key]
+        log_func("[2/4] ⚡ WhisperX model loaded from cache!")
+    else:
+        log_func("[2/4] 🧠 Loading WhisperX model (first time)...")
+        model_kwargs = dict(
+            whisper_arch=model_size,
+            device=device,
+            compute_type=compute_type,
         )
-        if lang and lang != "auto":
-            transcribe_kwargs["language"] = lang
+        if model_cache_dir:
+            model_kwargs["download_root"] = model_cache_dir
+        if device == "cpu":
+            # CTranslate2 defaults to 4 threads — use every core on CPU runs
+            model_kwargs["threads"] = os.cpu_count() or 4
+
+        model = whisperx.load_model(**model_kwargs)
+        _model_cache[cache_key] = model
+        # pipeline.model = faster-whisper WhisperModel, .model = CT2 Whisper
+        ct2_model = getattr(getattr(model, "model", None), "model", None)
+        resolved = getattr(ct2_model, "compute_type", compute_type)
+        log_func(f"✅ Model loaded & cached! (compute: {resolved})")
+
+    # ── Step 3: Transcribe (batched — 2-3x faster) ──
+    batch_size = _whisper_batch_size(torch, device)
+    log_func(f"[3/4] 🎤 Transcribing audio (batched, batch={batch_size})...")
+
+    transcribe_kwargs = dict(
+        audio=audio,
+        batch_size=batch_size,
+    )
+    if lang and lang != "auto":
+        transcribe_kwargs["language"] = lang
 
-        result = model.transcribe(**transcribe_kwargs)
-        detected_lang = result.get("language", lang)
+    while True:
+        try:
+            result = model.transcribe(**transcribe_kwargs)
+            break
+        except RuntimeError as e:
+            # CTranslate2/torch CUDA OOM → halve the batch and retry
+            if "out of memory" not in str(e).lower() or transcribe_kwargs["batch_size"] <= 1:
+                raise
+            torch.cuda.empty_cache()
+            transcribe_kwargs["batch_size"] //= 2
+            log_func(f"   ⚠️ Out of VRAM, retrying with batch={transcribe_kwargs['batch_size']}")
+    detected_lang = result.get("language", lang)
 
-        raw_segments = result.get("segments", [])
-        log_func(f"   Detected language: {detected_lang}")
-        log_func(f"   Raw segments: {len(raw_segments)}")
+    raw_segments = result.get("segments", [])
+    log_func(f"   Detected language: {detected_lang}")
+    log_func(f"   Raw segments: {len(raw_segments)}")
 
-        # ── Step 4: Word-level alignment (wav2vec2) ──
-        log_func("[4/4] 🎯 Aligning with wav2vec2 for word timestamps...")
-        try:
-            align_model, align_metadata = whisperx.load_align_model(
-                language_code=detected_lang,
-                device=device,
-            )
-            aligned = whisperx.align(
-                raw_segments,
-                align_model,
-                align_metadata,
-                audio,
-                device,
-                return_char_alignments=False,
-            )
-            aligned_segments = aligned.get("segments", raw_segments)
-
-            # Clean up align model
-            del align_model
-            log_func(f"✅ Alignment complete! {len(aligned_segments)} segments")
-        except Exception as e:
-            log_func(f"⚠️ Alignment failed ({e}), using raw segments")
-            aligned_segments = raw_segments
-
-        # Build output segments with word-level data
-        segments = []
-        full_text_parts = []
-        for seg in aligned_segments:
-            text = seg.get("text", "").strip()
-            if not text:
-                continue
-            segments.append({
-                "start": float(seg.get("start", 0)),
-                "end": float(seg.get("end", 0)),
-                "text": text,
-            })
-            full_text_parts.append(text)
+    # ── Step 4: Word-level alignment (wav2vec2) ──
+    log_func("[4/4] 🎯 Aligning with wav2vec2 for word timestamps...")
+    try:
+        align_model, align_metadata = _get_align_model(whisperx, detected_lang, device)
+        aligned = whisperx.align(
+            raw_segments,
+            align_model,
+            align_metadata,
+            audio,
+            device,
+            return_char_alignments=False,
+        )
+        aligned_segments = aligned.get("segments", raw_segments)
+        log_func(f"✅ Alignment complete! {len(aligned_segments)} segments")
+    except Exception as e:
+        log_func(f"⚠️ Alignment failed ({e}), using raw segments")
+        aligned_segments = raw_segments
 
-        full_text = " ".join(full_text_parts)
-        log_func(f"✅ Transcription complete! {len(segments)} segments")
-        log_func(f"   Text length: {len(full_text)} chars")
+    # Build output segments with word-level data
+    segments = []
+    full_text_parts = []
+    for seg in aligned_segments:
+        text = seg.get("text", "").strip()
+        if not text:
+            continue
+        segments.append({
+            "start": float(seg.get("start", 0)),
+            "end": float(seg.get("end", 0)),
+            "text": text,
+        })
+        full_text_parts.append(text)
 
-        # Write SRT
-        srt_content = _segments_to_srt(segments)
-        with open(output_srt_path, "w", encoding="utf-8") as f:
-            f.write(srt_content)
+    full_text = " ".join(full_text_parts)
+    log_func(f"✅ Transcription complete! {len(segments)} segments")
+    log_func(f"   Text length: {len(full_text)} chars")
 
-        log_func(f"✅ SRT saved: {output_srt_path}")
+    # Write SRT
+    srt_content = _segments_to_srt(segments)
+    with open(output_srt_path, "w", encoding="utf-8") as f:
+        f.write(srt_content)
 
-        # Model stays in cache for reuse
-        # Use clear_sub_cache() to free memory explicitly
+    log_func(f"✅ SRT saved: {output_srt_path}")
 
-        return {
-            "engine": "whisperx",
-            "language": detected_lang,
-            "text": full_text,
-            "srt_path": output_srt_path,
-            "segments_count": len(segments),
-            "segments": segments,
-        }
+    # Model stays in cache for reuse
+    # Use clear_sub_cache() to free memory explicitly
 
-    finally:
-        try:
-            os.remove(audio_path)
-        except OSError:
-            pass
+    return {
+        "engine": "whisperx",
+        "language": detected_lang,
+        "text": full_text,
+        "srt_path": output_srt_path,
+        "segments_count": len(segments),
+        "segments": segments,
+    }
 
 
 # ══════════════════════════════════════════════════
@@ -441,11 +572,12 @@ def transcribe_and_generate_srt(
         # Determine device
         device = "cuda:0" if torch.cuda.is_available() else "cpu"
         dtype = torch.bfloat16 if torch.cuda.is_available() else torch.float32
+        cpu_int8 = QWEN_CPU_INT8 and device == "cpu"
 
-        log_func(f"   Device: {device}, Model: {model_name}")
+        log_func(f"   Device: {device}, Model: {model_name}" + (" (int8)" if cpu_int8 else ""))
 
         # ── Step 2: Load model (cached) ──
-        cache_key = f"qwen:{model_name}:{device}:{use_aligner}"
+        cache_key = f"qwen:{model_name}:{device}:{use_aligner}" + (":int8" if cpu_int8 else "")
         if cache_key in _model_cache:
             model = _model_cache[cache_key]
             log_func("[2/4] ⚡ Qwen3-ASR model loaded from cache!")
@@ -469,6 +601,8 @@ def transcribe_and_generate_srt(
                 )
 
             model = Qwen3ASRModel.from_pretrained(model_name, **model_kwargs)
+            if cpu_int8 and not _quantize_linear_int8(model):
+                log_func("   ⚠️ int8 quantization skipped (no torch module found)")
             _model_cache[cache_key] = model
             log_func("✅ Model loaded & cached!")
 
@@ -107,10 +107,87 @@ def download_model(
         return _download_direct(repo_id, model_path, log_func)
 
 
-def _download_direct(repo_id: str, model_path: str, log_func) -> tuple:
-    """Fallback: download model files directly via HTTP."""
+def _remove_quiet(*paths: str) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _remote_size(url: str, content_range: str = None):
+    """Full size of url: the N of a 416's "Content-Range: bytes */N", else a
+    HEAD request's Content-Length. None if neither is available."""
     import urllib.request
-    
+
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1].strip()
+        if total.isdigit():
+            return int(total)
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method="HEAD"), timeout=60) as resp:
+            length = resp.headers.get("Content-Length")
+    except Exception:
+        return None
+    return int(length) if length and length.isdigit() else None
+
+
+def _download_one(url: str, dest: str) -> None:
+    """Stream url to dest via dest.part (1 MiB copies). A .part left by an
+    earlier attempt is resumed with a Range request; dest only appears once
+    the file is complete, so a partial file never passes the exists check.
+    Resume is pinned to the ETag the .part was started with (If-Range): a
+    new upstream revision answers 200 and the .part is rewritten. A .part
+    with no stored ETag is discarded rather than resumed."""
+    import urllib.request
+    import urllib.error
+
+    part = dest + ".part"
+    etag_path = part + ".etag"
+    have = os.path.getsize(part) if os.path.isfile(part) else 0
+    etag = None
+    if have:
+        try:
+            with open(etag_path, "r", encoding="utf-8") as f:
+                etag = f.read().strip() or None
+        except OSError:
+            pass
+        if etag is None:
+            _remove_quiet(part)  # Unknown revision — can't validate, restart
+            have = 0
+    req = urllib.request.Request(url)
+    if have:
+        req.add_header("Range", f"bytes={have}-")
+        req.add_header("If-Range", etag)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resuming = bool(have) and resp.status == 206
+            if not resuming:
+                # Fresh body: remember its revision for a later resume
+                # (weak ETags can't be used with If-Range)
+                new_etag = resp.headers.get("ETag")
+                if new_etag and not new_etag.startswith("W/"):
+                    with open(etag_path, "w", encoding="utf-8") as f:
+                        f.write(new_etag)
+                else:
+                    _remove_quiet(etag_path)
+            with open(part, "ab" if resuming else "wb") as f:
+                shutil.copyfileobj(resp, f, 1 << 20)
+    except urllib.error.HTTPError as e:
+        if not (e.code == 416 and have):
+            raise
+        # 416: nothing past `have` — complete only if `have` is the full size
+        if _remote_size(url, e.headers.get("Content-Range")) != have:
+            _remove_quiet(part, etag_path)  # Oversized / stale .part
+            return _download_one(url, dest)  # have == 0 now: plain GET
+    os.replace(part, dest)
+    _remove_quiet(etag_path)
+
+
+def _download_direct(repo_id: str, model_path: str, log_func) -> tuple:
+    """Fallback: download model files directly via HTTP (all files at once)."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
     base_url = f"https://huggingface.co/{repo_id}/resolve/main"
     
     files_to_download = REQUIRED_FILES + [
@@ -119,23 +196,36 @@ def _download_direct(repo_id: str, model_path: str, log_func) -> tuple:
         "special_tokens_map.json",
     ]
     
+    pending = []
     for filename in files_to_download:
-        url = f"{base_url}/{filename}"
-        dest = os.path.join(model_path, filename)
-        
-        if os.path.isfile(dest):
+        if os.path.isfile(os.path.join(model_path, filename)):
             log_func(f"   ✓ {filename} (exists)")
-            continue
-        
-        try:
-            log_func(f"   ↓ Downloading {filename}...")
-            urllib.request.urlretrieve(url, dest)
-            log_func(f"   ✓ {filename}")
-        except Exception as e:
-            if filename in REQUIRED_FILES:
-                log_func(f"   ❌ Failed: {filename} — {e}")
-                return False, model_path
-            # Optional files can fail silently
+        else:
+            pending.append(filename)
+
+    # Small files no longer queue behind model.bin — one connection each
+    failed = False
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            futures = {}
+            for filename in pending:
+                log_func(f"   ↓ Downloading {filename}...")
+                futures[pool.submit(
+                    _download_one, f"{base_url}/{filename}",
+                    os.path.join(model_path, filename),
+                )] = filename
+            for fut in as_completed(futures):
+                filename = futures[fut]
+                try:
+                    fut.result()
+                    log_func(f"   ✓ {filename}")
+                except Exception as e:
+                    if filename in REQUIRED_FILES:
+                        log_func(f"   ❌ Failed: {filename} — {e}")
+                        failed = True
+                    # Optional files can fail silently
+    if failed:
+        return False, model_path
     
     if is_model_ready(os.path.basename(model_path), os.path.dirname(model_path)):
         log_func("✅ Model download complete!")
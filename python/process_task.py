@@ -336,8 +336,10 @@ def process_task(job: Job) -> Result:
         os.makedirs(out_aud, exist_ok=True)
         os.makedirs(out_vid, exist_ok=True)
 
+        from core.model_manager import pick_compute_type
+
         device = "cuda" if torch.cuda.is_available() else "cpu"
-        compute_type = "float16" if device == "cuda" else "int8"
+        compute_type = pick_compute_type(device)
 
         # Display name mapping (hide technical names)
         display_names = {"tiny": "LITE", "base": "STARTER", "small": "STANDARD", "medium": "PRO", "large-v2": "ULTRA", "large-v3": "PREMIUM", "large-v3-turbo": "⚡ TURBO"}
@@ -581,6 +583,7 @@ def _cutting_loop(
     log_func,                # callback: log_func(msg) — stays in .py
     stop_check,              # callback: lambda: STOP_FLAG — stays in .py
     gc_func=None,            # callback: aggressive_gc() — optional
+    max_workers=1,           # >1: cut clips concurrently (callbacks must be thread-safe)
 ):
     """
     Core cutting loop — audio + video cut for each matched segment.
@@ -588,26 +591,20 @@ def _cutting_loop(
     Used by main.py and sk1_cutting.py.
     Subprocess calls are passed via ffmpeg_runner callback to avoid
     circular imports and Cython subprocess handle issues.
+
+    Clips are independent, so with max_workers > 1 up to that many clips
+    run their FFmpeg processes at once (startup/decode/encode overlap).
+    Keep it small — NVENC caps concurrent sessions on consumer GPUs.
     
     Returns number of clips successfully processed.
     """
     total = len(matches)
-    processed = 0
-
-    for idx, (vid, s_time, e_time, text) in enumerate(matches, 1):
-        if stop_check():
-            log_func("🛑 STOPPED.")
-            break
-
-        # Periodic GC every 20 clips to prevent memory buildup
-        if idx % 20 == 0 and gc_func:
-            gc_func()
 
+    def _cut_clip(idx, vid, s_time, e_time, text) -> bool:
         duration = e_time - s_time
 
         # ── Cut Audio (voice) ──
-        a_out = os.path.join(out_aud, f"{str(vid).zfill(3)}.mp3")
-        os.makedirs(os.path.dirname(a_out), exist_ok=True)
+        a_out = os.path.join(out_aud, f"{str(vid).zfill(3)}.mp3")  # out_aud made by caller
 
         try:
             ffmpeg_runner([
@@ -622,7 +619,7 @@ def _cutting_loop(
             ])
         except Exception as audio_err:
             log_func(f"❌ [V{str(vid).zfill(2)}] Audio cut FAILED: {audio_err}")
-            continue
+            return False
 
         # ── Cut Video: find by ID, keep original audio ──
         video_src = _find_video_by_vid_any_ext(video_source_dir, vid)
@@ -669,9 +666,60 @@ def _cutting_loop(
                 f"[{str(idx).zfill(2)}/{total}] [V{str(vid).zfill(2)}] "
                 f"✓ Audio + ❌ Video | {duration:.2f}s | Text: {text_display}"
             )
+        return True
 
-        processed += 1
+    if max_workers <= 1:
+        processed = 0
+        for idx, (vid, s_time, e_time, text) in enumerate(matches, 1):
+            if stop_check():
+                log_func("🛑 STOPPED.")
+                break
+
+            # Periodic GC every 20 clips to prevent memory buildup
+            if idx % 20 == 0 and gc_func:
+                gc_func()
+
+            if _cut_clip(idx, vid, s_time, e_time, text):
+                processed += 1
+        return processed
+
+    # ── Bounded parallel: at most max_workers clips in flight ──
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    processed = 0
+    error = None
+    pending = set()
+
+    def _collect(done):
+        nonlocal processed, error
+        for fut in done:
+            try:
+                if fut.result():
+                    processed += 1
+            except BaseException as e:  # Video cut / StopRequested — re-raise after drain
+                if error is None:
+                    error = e
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ClipCut") as pool:
+        for idx, (vid, s_time, e_time, text) in enumerate(matches, 1):
+            if len(pending) >= max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(done)
+            if error is not None:
+                break
+            if stop_check():
+                log_func("🛑 STOPPED.")
+                break
+
+            if idx % 20 == 0 and gc_func:
+                gc_func()
+
+            pending.add(pool.submit(_cut_clip, idx, vid, s_time, e_time, text))
+
+        _collect(wait(pending).done)
 
+    if error is not None:
+        raise error
     return processed
 
 
@@ -859,7 +907,7 @@ def _run_ai_subprocess_generic(
             "audio_path": audio_path,
             "model_name": model_name,
             "device": "cuda",
-            "compute_type": "float16",
+            "compute_type": None,  # Worker picks for its GPU (int8_float16 / float16)
             "lang_code": lang_code,
             "fast_mode": fast_mode,
             "model_cache_dir": model_cache_dir,
@@ -896,17 +944,18 @@ def _run_ai_subprocess_generic(
 
         process.wait()
 
+        # Failed worker never writes a result — report now, don't poll for it
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"AI subprocess failed (exit code {process.returncode})"
+            )
+
         # Wait for output file (subprocess may not flush immediately)
         max_wait = 5.0
         wait_start = time.time()
         while not os.path.exists(output_path) and (time.time() - wait_start) < max_wait:
             time.sleep(0.1)
 
-        if process.returncode != 0:
-            raise RuntimeError(
-                f"AI subprocess failed (exit code {process.returncode})"
-            )
-
         if not os.path.exists(output_path):
             raise FileNotFoundError(f"AI output not found: {output_path}")
 
@@ -971,6 +1020,7 @@ def _dev_transcribe_pipeline(
     log_func,
     stop_check,
     gc_func,
+    progress_emit=None,
 ):
     """Full DEV mode AI transcription pipeline — PROTECTED in .pyd.
 
@@ -984,7 +1034,7 @@ def _dev_transcribe_pipeline(
         fast_mode: Skip alignment if True
         model_cache_dir: HuggingFace model cache directory
         device: 'cuda' or 'cpu' (pre-calculated in wrapper)
-        compute_type: 'float16' or 'int8' (pre-calculated in wrapper)
+        compute_type: CTranslate2 type, e.g. 'int8_float16' (pre-calculated in wrapper)
         load_model_fn: whisperx.load_model callback
         load_audio_fn: whisperx.load_audio callback
         load_align_fn: whisperx.load_align_model callback
@@ -995,6 +1045,8 @@ def _dev_transcribe_pipeline(
         log_func: Logging callback
         stop_check: Lambda returning STOP_FLAG
         gc_func: aggressive_gc callback
+        progress_emit: the caller's progress-file emitter (msg_type, **kwargs)
+            — keeps every line on the caller's single writer/handle
 
     Returns:
         tuple (all_words, detected_lang)
@@ -1003,14 +1055,17 @@ def _dev_transcribe_pipeline(
 
     # File-based IPC: write directly to progress file for UI real-time updates
     # This bypasses stdout pipe buffer that can delay messages during heavy ops
-    _pf = os.path.join(tempfile.gettempdir(), f"aurasplit_progress_{os.getpid()}.jsonl")
-    def _pf_emit(msg_type, **kwargs):
-        try:
-            payload = {"type": msg_type, **kwargs}
-            with open(_pf, "a", encoding="utf-8") as f:
-                f.write(json.dumps(payload, ensure_ascii=False) + '\n')
-        except Exception:
-            pass
+    if progress_emit is not None:
+        _pf_emit = progress_emit
+    else:
+        _pf = os.path.join(tempfile.gettempdir(), f"aurasplit_progress_{os.getpid()}.jsonl")
+        def _pf_emit(msg_type, **kwargs):
+            try:
+                payload = {"type": msg_type, **kwargs}
+                with open(_pf, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(payload, ensure_ascii=False) + '\n')
+            except Exception:
+                pass
 
     # --- Step 1: Model load/cache (HIDDEN strategy) ---
     use_cached = (
@@ -12,6 +12,7 @@
 from __future__ import annotations
 
 import os
+import re
 import shlex
 import subprocess
 import threading
@@ -92,6 +93,39 @@ def _raise_ffmpeg_crash(
     )
 
 
+# Filtered PATH per raw PATH value — identical on every ffmpeg call of a run
+_CLEAN_PATH_CACHE: Dict[str, str] = {}
+
+
+def _clean_env(env: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Copy of env (default os.environ) without torch/CUDA dirs on PATH,
+    so FFmpeg doesn't load the wrong DLLs."""
+    clean_env = (env or os.environ).copy()
+    path = clean_env.get("PATH")
+    if path is not None:
+        cleaned = _CLEAN_PATH_CACHE.get(path)
+        if cleaned is None:
+            cleaned = _CLEAN_PATH_CACHE[path] = ";".join([
+                p for p in path.split(";")
+                if "torch" not in p.lower() and "cuda" not in p.lower()
+            ])
+        clean_env["PATH"] = cleaned
+    return clean_env
+
+
+def _hidden_startupinfo() -> "subprocess.STARTUPINFO":
+    """STARTUPINFO that hides the child's console window (windowed mode)."""
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE  # Super Grok Fix
+    return startupinfo
+
+
+# Line ends as text-mode readline() saw them: FFmpeg ends progress updates
+# with a bare \r, everything else with \n (or \r\n on Windows)
+_LINE_END_RE = re.compile(rb"\r\n|\r|\n")
+
+
 def execute_safe(
     cmd: Union[List[str], str],
     *,
@@ -118,19 +152,10 @@ def execute_safe(
     if not stream:
         try:
             # AI Studio Fix: Clean environment to prevent DLL conflicts
-            clean_env = (env or os.environ).copy()
-            # Remove torch/CUDA paths to prevent FFmpeg loading wrong DLLs
-            if "PATH" in clean_env:
-                clean_env["PATH"] = ";".join([
-                    p for p in clean_env["PATH"].split(";") 
-                    if "torch" not in p.lower() and "cuda" not in p.lower()
-                ])
-            
+            clean_env = _clean_env(env)
             # AI Studio Fix: STARTUPINFO for windowed mode
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE  # Super Grok Fix
-            
+            startupinfo = _hidden_startupinfo()
+
             cp = subprocess.run(
                 args,
                 cwd=cwd,
@@ -168,17 +193,9 @@ def execute_safe(
     # When ffmpeg outputs too much data, 64KB buffer fills up causing deadlock
     try:
         # AI Studio Fix: Clean environment for stream mode too
-        clean_env = (env or os.environ).copy()
-        if "PATH" in clean_env:
-            clean_env["PATH"] = ";".join([
-                p for p in clean_env["PATH"].split(";") 
-                if "torch" not in p.lower() and "cuda" not in p.lower()
-            ])
-        
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        startupinfo.wShowWindow = subprocess.SW_HIDE  # Super Grok Fix
-        
+        clean_env = _clean_env(env)
+        startupinfo = _hidden_startupinfo()
+
         try:
             proc = subprocess.Popen(
                 args,
@@ -187,10 +204,7 @@ def execute_safe(
                 stdout=subprocess.DEVNULL,  # FIX: Prevent buffer deadlock
                 stderr=subprocess.PIPE,     # Keep stderr for error capture
                 stdin=subprocess.DEVNULL,   # AI Studio: FFmpeg waits for 'q'
-                text=text_mode,
-                encoding="utf-8" if text_mode else None,
-                errors="replace" if text_mode else None,
-                bufsize=1,
+                bufsize=0,                  # Raw pipe — read in blocks below
                 creationflags=subprocess.CREATE_NO_WINDOW,
                 close_fds=False,            # FIX: close_fds=True corrupts parent stdout pipe on Windows
                 startupinfo=startupinfo,
@@ -200,8 +214,10 @@ def execute_safe(
         except OSError as e:
             _raise_cmd_not_found(args, e, cwd)
 
-        stderr_acc: List[str] = []
+        stderr_acc: List[bytes] = []
+        pending = b""
         start = time.time()
+        err_fd = proc.stderr.fileno() if proc.stderr else None
 
         while True:
             if _is_stopped():
@@ -229,21 +245,41 @@ def execute_safe(
                         pass
                 raise RuntimeError("TIMEOUT")
 
-            line = proc.stderr.readline() if proc.stderr else ""
-            if line:
-                stderr_acc.append(line)
+            # Up to 64 KB per read (returns whatever is ready) instead of one
+            # readline() per line; lines are split locally for log_func
+            chunk = os.read(err_fd, 65536) if err_fd is not None else b""
+            if chunk:
+                stderr_acc.append(chunk)
                 if log_func:
-                    try:
-                        log_func(line.rstrip("\n"))
-                    except Exception:
-                        pass
+                    buf = pending + chunk
+                    # A trailing \r may be the first half of \r\n — hold it
+                    hold_cr = buf.endswith(b"\r")
+                    if hold_cr:
+                        buf = buf[:-1]
+                    *lines, pending = _LINE_END_RE.split(buf)
+                    if hold_cr:
+                        pending += b"\r"
+                    for line in lines:
+                        try:
+                            log_func(line.decode("utf-8", "replace"))
+                        except Exception:
+                            pass
             else:
-                if proc.poll() is not None:
-                    break
-                time.sleep(0.01)
-
-        out = proc.stdout.read() if proc.stdout else ""
-        err = "".join(stderr_acc)
+                proc.wait()
+                break
+
+        if log_func and pending:
+            try:
+                log_func(pending.decode("utf-8", "replace").rstrip("\r"))
+            except Exception:
+                pass
+        if proc.stderr:
+            proc.stderr.close()
+
+        out = "" if text_mode else b""
+        err = b"".join(stderr_acc)
+        if text_mode:
+            err = err.decode("utf-8", "replace")
 
         cp = subprocess.CompletedProcess(args=args, returncode=proc.returncode, stdout=out, stderr=err)
 
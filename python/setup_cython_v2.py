@@ -15,17 +15,18 @@ FILES_TO_PROTECT = [
     "api_wrapper.py",
     "model_checker.py",
     "config/paths.py",
-    "_seq.py",
 ]
 
 # Files that MUST stay .py (crash in .pyd — proven in V1)
 # - sk1_cutting.py: subprocess + import torch/whisperx
 # - sk3_image_flow.py: subprocess + import torch/whisperx  
 # - safe_kernel.py: FFmpeg subprocess.Popen crash
+# - _seq.py: difflib.SequenceMatcher segfault on Japanese Unicode
 FILES_KEEP_PY = [
     "engines/sk1_cutting.py",
     "engines/sk3_image_flow.py",
     "safe_kernel.py",
+    "_seq.py",
 ]
 
 def main():
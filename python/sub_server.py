@@ -15,6 +15,7 @@ Models are cached in sub_engine._model_cache and persist across calls.
 import sys
 import os
 import json
+import threading
 import traceback
 
 # ── Fix Windows console encoding ──
@@ -134,11 +135,25 @@ def handle_sub_task(task: dict):
         _emit(task_id, "error", message=f"SUB error: {e}\n{traceback.format_exc()}")
 
 
+def _warmup_imports():
+    """Import sub_engine + torch in the background while waiting for the
+    first task — the first SUB no longer pays the multi-second import.
+    A task arriving mid-warmup just waits on the import lock.
+    sub_engine goes first: it sets the PYTORCH_CUDA_ALLOC_CONF default
+    (and warning filters) that must be in place before torch loads."""
+    try:
+        import engines.sub_engine  # noqa: F401
+        import torch  # noqa: F401
+    except Exception:
+        pass  # Real error surfaces on the task's own import
+
+
 def main():
     """Main loop — read JSON tasks from stdin, process them, stay alive."""
     # Signal ready
     _emit("server", "log", message="🚀 SUB Server started — models will be cached!")
     sys.stdout.flush()
+    threading.Thread(target=_warmup_imports, daemon=True, name="SubWarmup").start()
 
     for line in sys.stdin:
         line = line.strip()